@@ -396,3 +396,6 @@ GOOGLE_PLACES_NEARBY_URL = "https://places.googleapis.com/v1/places:searchNearby
 GOOGLE_PLACES_TEXT_URL = "https://places.googleapis.com/v1/places:searchText"
 GOOGLE_PLACE_DETAILS_URL = "https://places.googleapis.com/v1/places"
 
+
+# Text Search returns at most this many places per query (3 pages of 20)
+GOOGLE_TEXT_SEARCH_MAX_RESULTS = 60
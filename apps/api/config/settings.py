@@ -4,6 +4,9 @@ import os
 # Load .env
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../.env'))
 
+# apps/api: default on-disk paths resolve against it, not the working directory
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # DB & API Settings
 MONGODB_URI = os.getenv("MONGO_DB_URI")
 MONGODB_NAME = os.getenv("MONGO_DB_NAME", "leads_db")
@@ -12,3 +15,93 @@ GOOGLE_API_KEYS = [key.strip() for key in os.getenv("GOOGLE_API_KEYS", "").split
 API_REQUEST_CAP = int(os.getenv("API_REQUEST_CAP", "9500"))
 
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+
+# Outbound HTTP client (shared keep-alive pool for Google APIs)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Crawl scheduler: tiles open at once, globally and per configured API key.
+# Open tiles mostly wait on page tokens, so this can exceed PLACES_MAX_INFLIGHT_REQUESTS.
+CRAWL_MAX_CONCURRENT_TILES = int(os.getenv("CRAWL_MAX_CONCURRENT_TILES", "32"))
+CRAWL_MAX_CONCURRENT_TILES_PER_KEY = int(os.getenv("CRAWL_MAX_CONCURRENT_TILES_PER_KEY", "16"))
+
+# Places request pacing: in-flight HTTP requests and next-page token timing
+PLACES_MAX_INFLIGHT_REQUESTS = int(os.getenv("PLACES_MAX_INFLIGHT_REQUESTS", "8"))
+PLACES_PAGE_TOKEN_DELAY = float(os.getenv("PLACES_PAGE_TOKEN_DELAY", "2.0"))
+PLACES_PAGE_TOKEN_RETRY_INTERVAL = float(os.getenv("PLACES_PAGE_TOKEN_RETRY_INTERVAL", "0.5"))
+PLACES_PAGE_TOKEN_MAX_RETRIES = int(os.getenv("PLACES_PAGE_TOKEN_MAX_RETRIES", "4"))
+
+# API key pool: per-key QPS budget and cooldown after 429s
+GOOGLE_KEY_QPS = float(os.getenv("GOOGLE_KEY_QPS", "10"))
+GOOGLE_KEY_BURST = float(os.getenv("GOOGLE_KEY_BURST", "10"))
+GOOGLE_KEY_COOLDOWN_BASE = float(os.getenv("GOOGLE_KEY_COOLDOWN_BASE", "5"))
+GOOGLE_KEY_COOLDOWN_MAX = float(os.getenv("GOOGLE_KEY_COOLDOWN_MAX", "120"))
+
+# Retry layer for Places calls (429 / 5xx / timeouts) and per-endpoint circuit breaker
+PLACES_RETRY_MAX_ATTEMPTS = int(os.getenv("PLACES_RETRY_MAX_ATTEMPTS", "5"))
+PLACES_RETRY_BASE_DELAY = float(os.getenv("PLACES_RETRY_BASE_DELAY", "0.5"))
+PLACES_RETRY_MAX_DELAY = float(os.getenv("PLACES_RETRY_MAX_DELAY", "30"))
+PLACES_RETRY_MAX_TOTAL_TIME = float(os.getenv("PLACES_RETRY_MAX_TOTAL_TIME", "90"))
+PLACES_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("PLACES_CIRCUIT_FAILURE_THRESHOLD", "10"))
+PLACES_CIRCUIT_RESET_TIMEOUT = float(os.getenv("PLACES_CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Tiles that fail with a transient Places error are re-queued this many times
+CRAWL_TILE_MAX_REQUEUES = int(os.getenv("CRAWL_TILE_MAX_REQUEUES", "2"))
+
+# On-disk cache of Places search pages (re-crawls of the same tile/query are free)
+PLACES_CACHE_ENABLED = os.getenv("PLACES_CACHE_ENABLED", "True").lower() == "true"
+PLACES_CACHE_PATH = os.getenv("PLACES_CACHE_PATH", os.path.join(BASE_DIR, "data", "cache", "places_cache.sqlite"))
+PLACES_CACHE_TTL_DAYS = float(os.getenv("PLACES_CACHE_TTL_DAYS", "30"))
+PLACES_CACHE_MAX_MB = int(os.getenv("PLACES_CACHE_MAX_MB", "512"))
+
+# Adaptive (quadtree) text-search crawl: coarse root tiles split while results saturate
+ADAPTIVE_ROOT_TILE_SCALE = float(os.getenv("ADAPTIVE_ROOT_TILE_SCALE", "4"))
+ADAPTIVE_MAX_DEPTH = int(os.getenv("ADAPTIVE_MAX_DEPTH", "5"))
+ADAPTIVE_MIN_TILE_KM = float(os.getenv("ADAPTIVE_MIN_TILE_KM", "1.0"))
+
+# Streamed crawls: fetched batches waiting to be written before the crawler pauses
+CRAWL_WRITE_QUEUE_SIZE = int(os.getenv("CRAWL_WRITE_QUEUE_SIZE", "8"))
+
+# Compiled geometry store (python -m utils.geo_store); used instead of the GeoJSON when present and current
+GEOSTORE_ENABLED = os.getenv("GEOSTORE_ENABLED", "True").lower() == "true"
+GEOSTORE_DIR = os.getenv("GEOSTORE_DIR", os.path.join(BASE_DIR, "data", "geostore"))
+
+# All-regions tile planning: worker processes (0 = one per CPU, 1 = serial) and regions per work unit
+TILE_PLAN_WORKERS = int(os.getenv("TILE_PLAN_WORKERS", "0"))
+TILE_PLAN_CHUNK_SIZE = int(os.getenv("TILE_PLAN_CHUNK_SIZE", "16"))
+
+# Tile-plan cache (per region, invalidated by sizing-rule or boundary-file changes)
+TILE_PLAN_CACHE_ENABLED = os.getenv("TILE_PLAN_CACHE_ENABLED", "True").lower() == "true"
+TILE_PLAN_CACHE_PATH = os.getenv("TILE_PLAN_CACHE_PATH", os.path.join(BASE_DIR, "data", "cache", "tile_plans.sqlite"))
+
+# Cross-region tile dedup for full-country crawls: drop tiles this much covered by kept tiles
+TILE_DEDUP_COVERAGE = float(os.getenv("TILE_DEDUP_COVERAGE", "0.9"))
+TILE_DEDUP_BUCKET_DEG = float(os.getenv("TILE_DEDUP_BUCKET_DEG", "0.5"))
+# Padding around a region's extent within which kept tiles wait for it to be planned before release
+TILE_DEDUP_HOLD_MARGIN_DEG = float(os.getenv("TILE_DEDUP_HOLD_MARGIN_DEG", "0.5"))
+
+# Tag leads with the SA2/LGA/GCCSA polygons containing them at ingest
+REGION_TAGGING_ENABLED = os.getenv("REGION_TAGGING_ENABLED", "True").lower() == "true"
+
+# Text search keeps only places inside the crawled region's polygon (not just the tile rectangle)
+PLACES_POLYGON_FILTER_ENABLED = os.getenv("PLACES_POLYGON_FILTER_ENABLED", "True").lower() == "true"
+REGION_GEOMETRY_CACHE_SIZE = int(os.getenv("REGION_GEOMETRY_CACHE_SIZE", "512"))
+
+# Region autocomplete: fuzzy (trigram) matches below this similarity are dropped
+REGION_SEARCH_MIN_SIMILARITY = float(os.getenv("REGION_SEARCH_MIN_SIMILARITY", "0.3"))
+
+# /leads pagination: default and maximum page size
+LEADS_PAGE_SIZE = int(os.getenv("LEADS_PAGE_SIZE", "100"))
+LEADS_MAX_PAGE_SIZE = int(os.getenv("LEADS_MAX_PAGE_SIZE", "1000"))
+# Streamed /leads exports (format=ndjson|csv): documents fetched and written per chunk
+LEADS_STREAM_BATCH_SIZE = int(os.getenv("LEADS_STREAM_BATCH_SIZE", "1000"))
+
+# Materialized /leads/summary counters (lead_stats), kept current by the bulk lead writer
+LEAD_STATS_ENABLED = os.getenv("LEAD_STATS_ENABLED", "True").lower() == "true"
+
+# In-process cache for /leads, /leads/summary and coverage responses (cleared whenever leads are written)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
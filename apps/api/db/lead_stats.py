@@ -0,0 +1,136 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from db.mongo import LEAD_STATS_INDEXES, ensure_indexes
+
+# Counter kinds in the lead_stats collection ({kind, state, type, count}):
+#   state_type  leads per (state, type)      type  leads per type tag      total  all leads
+STATE_TYPE = "state_type"
+TYPE = "type"
+TOTAL = "total"
+# Written by rebuild_lead_stats; until it exists the counters only cover recent writes
+META = "meta"
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def count_lead(deltas: Counter, state: Optional[str], types, sign: int = 1):
+    for type_ in set(types or ()):
+        deltas[(STATE_TYPE, state, type_)] += sign
+        deltas[(TYPE, None, type_)] += sign
+
+
+def lead_stats_deltas(inserted_docs: list, docs: list, previous: dict) -> Counter:
+    """
+    Counter changes for one bulk upsert: +1 for every inserted lead, and the type changes of
+    already stored leads whose `types` were refreshed (`previous` maps their place_id to the
+    stored {state, types}; state is insert-only, so it never moves).
+    """
+    deltas = Counter()
+    for doc in inserted_docs:
+        count_lead(deltas, doc.get("state"), doc.get("types"))
+        deltas[(TOTAL, None, None)] += 1
+
+    for doc in docs:
+        stored = previous.get(doc["place_id"])
+        if stored is None or "types" not in doc:
+            continue
+        old_types, new_types = set(stored.get("types") or ()), set(doc["types"] or ())
+        count_lead(deltas, stored.get("state"), old_types - new_types, -1)
+        count_lead(deltas, stored.get("state"), new_types - old_types)
+    return deltas
+
+
+async def apply_lead_stats(db: AsyncIOMotorDatabase, deltas: Counter):
+    """Applies counter changes as one unordered bulk of atomic $inc upserts."""
+    operations = [
+        UpdateOne({"kind": kind, "state": state, "type": type_}, {"$inc": {"count": delta}}, upsert=True)
+        for (kind, state, type_), delta in deltas.items() if delta
+    ]
+    if not operations:
+        return
+    try:
+        await db.lead_stats.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Two writers upserting a brand-new counter at once: the loser's $inc retries as an update
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+            raise
+        await db.lead_stats.bulk_write([operations[err["index"]] for err in errors], ordered=False)
+
+
+async def rebuild_lead_stats(db: AsyncIOMotorDatabase) -> dict:
+    """
+    Recomputes every counter from the leads collection into a scratch collection and swaps it
+    in with one rename, so readers never see a half-built table. Increments from crawls that
+    write while the rebuild runs are lost; run it while crawls are paused.
+    """
+    pipeline = [
+        {"$project": {"state": 1, "types": {"$setUnion": [{"$ifNull": ["$types", []]}, []]}}},
+        {"$unwind": "$types"},
+        {"$group": {"_id": {"state": "$state", "type": "$types"}, "count": {"$sum": 1}}}
+    ]
+    deltas = Counter()
+    async for group in db.leads.aggregate(pipeline, allowDiskUse=True):
+        state, type_ = group["_id"].get("state"), group["_id"].get("type")
+        deltas[(STATE_TYPE, state, type_)] += group["count"]
+        deltas[(TYPE, None, type_)] += group["count"]
+    deltas[(TOTAL, None, None)] = await db.leads.count_documents({})
+
+    counters = [
+        {"kind": kind, "state": state, "type": type_, "count": count}
+        for (kind, state, type_), count in deltas.items()
+    ]
+    counters.append({"kind": META, "state": None, "type": None, "rebuilt_at": datetime.utcnow()})
+
+    scratch = db.lead_stats_rebuild
+    await scratch.drop()
+    await ensure_indexes(scratch, LEAD_STATS_INDEXES)
+    await scratch.insert_many(counters)
+    await scratch.rename("lead_stats", dropTarget=True)
+
+    summary = {"counters": len(counters) - 1, "total_leads": deltas[(TOTAL, None, None)]}
+    print(f"✅ lead_stats rebuilt: {summary}")
+    return summary
+
+
+async def read_lead_summary(
+    db: AsyncIOMotorDatabase,
+    state: Optional[str],
+    business_type: Optional[str],
+    valid_types: set
+) -> Optional[dict]:
+    """
+    The /leads/summary payload read from the counters (O(states x types)), or None if
+    lead_stats has never been rebuilt and so doesn't cover older leads.
+    """
+    if not await db.lead_stats.find_one({"kind": META}):
+        return None
+
+    query = {"kind": STATE_TYPE, "count": {"$gt": 0}}
+    if state:
+        query["state"] = state
+    if business_type:
+        query["type"] = business_type
+
+    summary = defaultdict(lambda: defaultdict(int))
+    async for counter in db.lead_stats.find(query):
+        # Only the configured business types, as in the aggregation fallback
+        if counter["state"] and counter["type"] in valid_types:
+            summary[counter["state"]][counter["type"]] += counter["count"]
+
+    extra_types = {
+        counter["type"]: counter["count"]
+        async for counter in db.lead_stats.find({"kind": TYPE, "count": {"$gt": 0}})
+        if counter["type"]
+    }
+    total = await db.lead_stats.find_one({"kind": TOTAL})
+
+    return {
+        "summary": summary,
+        "extra_types": extra_types,
+        "total_businesses": total["count"] if total else 0
+    }
@@ -0,0 +1,134 @@
+"""
+One-off data migrations for the leads collection.
+
+Run from apps/api:
+    python -m db.migrations backfill_regions [--batch-size 1000]
+    python -m db.migrations backfill_geo
+    python -m db.migrations backfill_lowercase
+    python -m db.migrations rebuild_lead_stats
+"""
+import argparse
+import asyncio
+from pymongo import UpdateOne
+from db.lead_stats import rebuild_lead_stats
+from db.mongo import db
+from db.queries import LOWERCASE_SHADOW_FIELDS
+from utils.region_membership import MEMBERSHIP_FIELDS, get_region_membership_index
+
+
+async def backfill_region_membership(batch_size: int = 1000, only_missing: bool = False) -> dict:
+    """
+    Tags existing leads with their SA2/LGA/GCCSA codes and names, one vectorized lookup and
+    one unordered bulk write per batch.
+    """
+    index = get_region_membership_index()
+    query = {"location": {"$exists": True}}
+    if only_missing:
+        query["sa2_code"] = {"$exists": False}
+
+    scanned = tagged = modified = 0
+    cursor = db.leads.find(query, {"_id": 1, "location": 1}).batch_size(batch_size)
+    batch = []
+
+    async def flush():
+        nonlocal tagged, modified
+        tagged += await asyncio.to_thread(index.tag, batch)
+        operations = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": {field: doc[field] for field in MEMBERSHIP_FIELDS if field in doc}})
+            for doc in batch if any(field in doc for field in MEMBERSHIP_FIELDS)
+        ]
+        if operations:
+            result = await db.leads.bulk_write(operations, ordered=False)
+            modified += result.modified_count
+        batch.clear()
+
+    async for doc in cursor:
+        scanned += 1
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await flush()
+            print(f"🗺️ Backfilled region membership for {scanned} leads...")
+    if batch:
+        await flush()
+
+    summary = {"scanned": scanned, "tagged": tagged, "modified": modified}
+    print(f"✅ Region membership backfill complete: {summary}")
+    return summary
+
+
+async def backfill_geo_points() -> dict:
+    """
+    Writes the GeoJSON `geo` point (indexed 2dsphere) on leads stored before it was added,
+    in one server-side pipeline update. Handles both Places location shapes.
+    """
+    has_coordinates = {"$or": [
+        {"location.latitude": {"$type": "number"}, "location.longitude": {"$type": "number"}},
+        {"location.lat": {"$type": "number"}, "location.lng": {"$type": "number"}},
+    ]}
+    result = await db.leads.update_many(
+        {"geo": {"$exists": False}, **has_coordinates},
+        [{"$set": {"geo": {"type": "Point", "coordinates": [
+            {"$ifNull": ["$location.longitude", "$location.lng"]},
+            {"$ifNull": ["$location.latitude", "$location.lat"]},
+        ]}}}]
+    )
+    summary = {"matched": result.matched_count, "modified": result.modified_count}
+    print(f"✅ GeoJSON point backfill complete: {summary}")
+    return summary
+
+
+async def backfill_lowercase_fields() -> dict:
+    """
+    Writes the lower-cased types_lc / category_lc / business_type_lc copies on leads stored
+    before they existed, in one server-side pipeline update.
+    """
+    missing = [
+        {field: {"$exists": True}, shadow: {"$exists": False}}
+        for field, shadow in LOWERCASE_SHADOW_FIELDS.items()
+    ]
+
+    def lowered(field):
+        value = f"${field}"
+        if field == "types":
+            return {"$map": {
+                "input": {"$filter": {"input": {"$ifNull": [value, []]}, "cond": {"$eq": [{"$type": "$$this"}, "string"]}}},
+                "in": {"$toLower": {"$trim": {"input": "$$this"}}}
+            }}
+        return {"$cond": [{"$eq": [{"$type": value}, "string"]}, {"$toLower": {"$trim": {"input": value}}}, "$$REMOVE"]}
+
+    result = await db.leads.update_many(
+        {"$or": missing},
+        [{"$set": {shadow: lowered(field) for field, shadow in LOWERCASE_SHADOW_FIELDS.items()}}]
+    )
+    summary = {"matched": result.matched_count, "modified": result.modified_count}
+    print(f"✅ Lower-case filter field backfill complete: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Leads collection migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    regions = commands.add_parser("backfill_regions", help="Tag existing leads with SA2/LGA/GCCSA membership")
+    regions.add_argument("--batch-size", type=int, default=1000)
+    regions.add_argument("--only-missing", action="store_true", help="Skip leads that already have an sa2_code")
+
+    commands.add_parser("backfill_geo", help="Add the GeoJSON `geo` point to leads stored without one")
+
+    commands.add_parser("backfill_lowercase", help="Add types_lc / category_lc / business_type_lc to existing leads")
+
+    commands.add_parser("rebuild_lead_stats", help="Recompute the /leads/summary counters from scratch")
+
+    args = parser.parse_args(argv)
+    if args.command == "backfill_regions":
+        asyncio.run(backfill_region_membership(args.batch_size, args.only_missing))
+    elif args.command == "backfill_geo":
+        asyncio.run(backfill_geo_points())
+    elif args.command == "backfill_lowercase":
+        asyncio.run(backfill_lowercase_fields())
+    elif args.command == "rebuild_lead_stats":
+        asyncio.run(rebuild_lead_stats(db))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING
+from pymongo import ASCENDING, GEOSPHERE, IndexModel
 import os
 from dotenv import load_dotenv
 
@@ -12,14 +12,95 @@ client = AsyncIOMotorClient(MONGODB_URI)
 db = client[MONGODB_NAME]
 
 leads_collection = db["leads"]
+lead_stats_collection = db["lead_stats"]
+
+# Declared indexes for the leads collection, one per access pattern:
+#   /leads                       types / category / business_type (lower-cased *_lc copies), with or without state
+#   /leads/crawl/.../coverage    state + region, or a SA2/LGA/GCCSA code
+#   geo queries                  `geo`, the GeoJSON point written at ingest
+LEAD_INDEXES = [
+    IndexModel([("place_id", ASCENDING)], unique=True, name="unique_place_id_index"),
+    IndexModel([("state", ASCENDING), ("region", ASCENDING)], name="state_region_index"),
+    # Trailing _id lets /leads page through a state + type in _id order straight off the index
+    IndexModel([("state", ASCENDING), ("types_lc", ASCENDING), ("_id", ASCENDING)], name="state_types_lc_id_index"),
+    IndexModel([("types_lc", ASCENDING), ("state", ASCENDING)], name="types_lc_state_index"),
+    IndexModel(
+        [("state", ASCENDING), ("category_lc", ASCENDING), ("business_type_lc", ASCENDING)],
+        name="state_category_lc_business_type_lc_index"
+    ),
+    IndexModel([("business_type_lc", ASCENDING), ("state", ASCENDING)], name="business_type_lc_state_index"),
+    IndexModel([("sa2_code", ASCENDING)], name="sa2_code_index"),
+    IndexModel([("lga_code", ASCENDING)], name="lga_code_index"),
+    IndexModel([("gccsa_code", ASCENDING)], name="gccsa_code_index"),
+    IndexModel([("geo", GEOSPHERE)], name="geo_2dsphere_index"),
+]
+
+# Materialized summary counters (see db/lead_stats.py): one document per counter key
+LEAD_STATS_INDEXES = [
+    IndexModel([("kind", ASCENDING), ("state", ASCENDING), ("type", ASCENDING)], unique=True, name="kind_state_type_index"),
+]
+
+
+async def ensure_indexes(collection, indexes: list) -> dict:
+    """
+    Ensures every declared index exists on `collection`. Each one is created on its own, so a
+    failing build (e.g. duplicate place_ids blocking the unique index) doesn't hold back the rest.
+    Existing indexes are a no-op; new ones are built without blocking the collection. An
+    existing index whose name matches but whose key doesn't is reported as a conflict and left
+    alone, since dropping it is an operator decision.
+    """
+    existing = {index["name"]: list(index["key"].items()) async for index in collection.list_indexes()}
+    created, failed, conflicts = [], [], []
+    for index in indexes:
+        name = index.document["name"]
+        if name in existing:
+            # Compared in order: a compound key with its fields swapped is a different index
+            if existing[name] != list(index.document["key"].items()):
+                conflicts.append(name)
+                print(f"⚠️ MongoDB index {name} on {collection.name} has key {dict(existing[name])}, "
+                      f"expected {dict(index.document['key'])}; drop it to rebuild")
+            continue
+        try:
+            await collection.create_indexes([index])
+            created.append(name)
+        except Exception as e:
+            failed.append(name)
+            print(f"Failed to create MongoDB index {name}:", str(e))
+    ensured = len(indexes) - len(failed) - len(conflicts)
+    print(f"MongoDB indexes ensured on {collection.name}: {ensured} of {len(indexes)} ({len(created)} new).")
+    return {"created": created, "failed": failed, "conflicts": conflicts}
+
 
 async def init_db_indexes():
-    try:
-        await leads_collection.create_index(
-            [("place_id", ASCENDING)],
-            unique=True,
-            name="unique_place_id_index"
-        )
-        print("MongoDB Index ensured.")
-    except Exception as e:
-        print("Failed to create MongoDB index:", str(e))
+    return {
+        "leads": await ensure_indexes(leads_collection, LEAD_INDEXES),
+        "lead_stats": await ensure_indexes(lead_stats_collection, LEAD_STATS_INDEXES)
+    }
+
+
+async def index_usage_report() -> list:
+    """
+    Per-index usage on the leads collection from $indexStats (operations served since the
+    server started tracking them), flagged against LEAD_INDEXES. Declared indexes that don't
+    exist yet are listed with `present: False`; undeclared ones that never ran are drop candidates.
+    """
+    declared = {index.document["name"]: index.document["key"] for index in LEAD_INDEXES}
+    report = []
+    async for stats in leads_collection.aggregate([{"$indexStats": {}}]):
+        name = stats["name"]
+        report.append({
+            "name": name,
+            "key": dict(stats["key"]),
+            "ops": stats.get("accesses", {}).get("ops", 0),
+            "since": stats.get("accesses", {}).get("since"),
+            "declared": name in declared or name == "_id_",
+            "present": True,
+            "building": bool(stats.get("building", False))
+        })
+
+    present = {entry["name"] for entry in report}
+    report.extend(
+        {"name": name, "key": dict(key), "ops": 0, "since": None, "declared": True, "present": False, "building": False}
+        for name, key in declared.items() if name not in present
+    )
+    return sorted(report, key=lambda entry: -entry["ops"])
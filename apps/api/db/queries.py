@@ -1,73 +1,327 @@
+import asyncio
+import base64
+import csv
+import io
+import json
+import re
+from collections import Counter
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from typing import Optional, Dict, Any, List
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
 import os
 import pandas as pd
 from datetime import datetime
+from config.settings import REGION_TAGGING_ENABLED, LEADS_PAGE_SIZE, LEADS_STREAM_BATCH_SIZE, LEAD_STATS_ENABLED
+from db.lead_stats import apply_lead_stats, count_lead, lead_stats_deltas, TOTAL
+from utils.region_membership import MEMBERSHIP_FIELDS, get_region_membership_index, lead_geo_point
+from utils.response_cache import get_response_cache
 
-# Check if a business already exists using place_id
-async def is_duplicate(db: AsyncIOMotorDatabase, place_id: str) -> bool:
-    existing = await db.leads.find_one({"place_id": place_id})
-    return existing is not None
+# Fields sourced from the Places API; refreshed whenever a crawl sees the place again.
+# Boundary membership and the GeoJSON `geo` point are derived from location, so they are
+# refreshed along with it.
+# Everything else (crawl metadata, tags, marketing flags) is only written on first insert.
+PLACES_REFRESH_FIELDS = (
+    "name", "address", "phone", "website", "location", "geo",
+    "types", "types_lc", "rating", "total_reviews", "opening_hours"
+) + MEMBERSHIP_FIELDS
 
-# Insert a new business lead
-async def insert_lead(db: AsyncIOMotorDatabase, lead_data: Dict[str, Any]) -> str:
-    result = await db.leads.insert_one(lead_data)
-    return str(result.inserted_id)
+# Lower-cased copies of the filterable fields, so case-insensitive filters are exact-match index lookups
+LOWERCASE_SHADOW_FIELDS = {"types": "types_lc", "category": "category_lc", "business_type": "business_type_lc"}
 
-# Batch insert with deduplication
-async def insert_leads_batch(db: AsyncIOMotorDatabase, leads: List[Dict[str, Any]]) -> int:
-    if not leads:
-        return 0
+DUPLICATE_KEY_ERROR = 11000
 
-    # Deduplicate by checking existing place_ids
-    place_ids = [lead["place_id"] for lead in leads]
-    existing = await db.leads.find({"place_id": {"$in": place_ids}}).to_list(length=len(place_ids))
-    existing_ids = {doc["place_id"] for doc in existing}
 
-    # Filter new ones
-    new_leads = [lead for lead in leads if lead["place_id"] not in existing_ids]
+def add_lowercase_shadows(doc: dict) -> dict:
+    """Sets types_lc / category_lc / business_type_lc from the lead's own values."""
+    for field, shadow in LOWERCASE_SHADOW_FIELDS.items():
+        value = doc.get(field)
+        if isinstance(value, str):
+            doc[shadow] = value.strip().lower()
+        elif isinstance(value, list):
+            doc[shadow] = [item.strip().lower() for item in value if isinstance(item, str)]
+    return doc
 
-    if not new_leads:
-        return 0
 
-    result = await db.leads.insert_many(new_leads)
-    return len(result.inserted_ids)
+# Batched writer: unordered bulk upserts keyed on place_id
+async def bulk_upsert_leads(db: AsyncIOMotorDatabase, leads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Upserts a batch of leads in one round trip. New place_ids are inserted whole; known ones
+    only get their Places fields refreshed. A refresh that loses a race with another writer
+    changing the same lead's types is dropped (the next crawl refreshes it). Returns
+    inserted/matched/modified counts and the newly inserted documents (with their `_id`).
+    """
+    # One op per place_id: duplicates inside a batch would race each other on the unique index
+    unique_leads = {}
+    for lead in leads:
+        place_id = lead.get("place_id")
+        if place_id and place_id not in unique_leads:
+            unique_leads[place_id] = lead
 
-# Get leads filtered by state, type, category, or business_type
-async def get_leads_by_filter(
-    db: AsyncIOMotorDatabase,
+    docs = list(unique_leads.values())
+    if not docs:
+        return {"inserted": 0, "matched": 0, "modified": 0, "inserted_docs": []}
+
+    if REGION_TAGGING_ENABLED:
+        # True SA2/LGA/GCCSA membership for the whole batch in one vectorized lookup per layer
+        await asyncio.to_thread(get_region_membership_index().tag, docs)
+
+    previous = {}
+    if LEAD_STATS_ENABLED:
+        # Stored types of leads we're about to refresh, so summary counters follow type changes
+        previous = {
+            lead["place_id"]: lead
+            async for lead in db.leads.find({"place_id": {"$in": list(unique_leads)}}, {"place_id": 1, "state": 1, "types": 1})
+        }
+
+    now = datetime.utcnow()
+    operations = []
+    for doc in docs:
+        doc.setdefault("retrieved_at", now)
+        geo = lead_geo_point(doc.get("location"))
+        if geo:
+            doc["geo"] = geo
+        add_lowercase_shadows(doc)
+        refresh = {k: doc[k] for k in PLACES_REFRESH_FIELDS if k in doc}
+        on_insert = {k: v for k, v in doc.items() if k not in refresh and k != "_id"}
+        update = {"$setOnInsert": on_insert}
+        if refresh:
+            update["$set"] = refresh
+        match = {"place_id": doc["place_id"]}
+        if doc["place_id"] in previous:
+            # Compare-and-set on the types we read: if a concurrent writer changed them first, this
+            # upsert matches nothing, its insert hits the unique index and is skipped below, so the
+            # same type change is never counted twice
+            match["types"] = previous[doc["place_id"]].get("types")
+        operations.append(UpdateOne(match, update, upsert=True))
+
+    try:
+        result = await db.leads.bulk_write(operations, ordered=False)
+        summary = result.bulk_api_result
+    except BulkWriteError as e:
+        # A concurrent writer can insert the same place_id between our upsert's match and
+        # insert (or change its types first); the unique index rejects ours, which just means
+        # the lead already exists and that writer's refresh stands
+        summary = e.details
+        other_errors = [err for err in summary.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY_ERROR]
+        if other_errors:
+            raise
+        summary["nMatched"] = summary.get("nMatched", 0) + len(summary.get("writeErrors", []))
+
+    inserted_docs = []
+    for upserted in summary.get("upserted", []):
+        doc = docs[upserted["index"]]
+        doc["_id"] = upserted["_id"]
+        inserted_docs.append(doc)
+
+    if LEAD_STATS_ENABLED:
+        rejected = {err["index"] for err in summary.get("writeErrors", [])}
+        written = [doc for i, doc in enumerate(docs) if i not in rejected]
+        await apply_lead_stats(db, lead_stats_deltas(inserted_docs, written, previous))
+
+    # Cached /leads, summary and coverage responses may now be stale
+    if summary.get("nUpserted", 0) or summary.get("nModified", 0):
+        get_response_cache().invalidate()
+
+    return {
+        "inserted": summary.get("nUpserted", 0),
+        "matched": summary.get("nMatched", 0),
+        "modified": summary.get("nModified", 0),
+        "inserted_docs": inserted_docs
+    }
+
+# Build the leads query for state, type, category, or business_type filters
+def build_leads_filter(
     state: Optional[str] = None,
     type_: Optional[str] = None,
     category: Optional[str] = None,
     business_type: Optional[str] = None
-):
+) -> dict:
     query = {}
 
     if state:
         query["state"] = state
 
+    # Case-insensitive exact matches against the lower-cased shadow fields (indexed, no regex)
     if type_:
-        # Ensure we only match this exact type inside the "types" array
-        query["types"] = {"$elemMatch": {"$regex": f"^{type_}$", "$options": "i"}}
+        query["types_lc"] = type_.strip().lower()
 
     if category:
-        query["category"] = {"$regex": f"^{category}$", "$options": "i"}
+        query["category_lc"] = category.strip().lower()
 
     if business_type:
-        query["business_type"] = {"$regex": f"^{business_type}$", "$options": "i"}
+        query["business_type_lc"] = business_type.strip().lower()
+
+    return query
+
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+
+
+def encode_leads_cursor(last_id: ObjectId) -> str:
+    """Opaque page token: the last `_id` served, base64url-encoded."""
+    raw = json.dumps({"after": str(last_id)}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_leads_cursor(cursor: str) -> ObjectId:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return ObjectId(json.loads(raw)["after"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def leads_projection(fields: Optional[str]) -> Optional[dict]:
+    """
+    Mongo projection for a comma-separated `fields` list (None = whole documents).
+    `_id` is always included since page cursors are built from it.
+    """
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    invalid = [name for name in names if not _FIELD_NAME.match(name)]
+    if invalid:
+        raise ValueError(f"Invalid field name(s): {', '.join(invalid)}")
+    return {"_id": 1, **{name: 1 for name in names}}
+
+
+async def get_leads_page(
+    db: AsyncIOMotorDatabase,
+    state: Optional[str] = None,
+    type_: Optional[str] = None,
+    category: Optional[str] = None,
+    business_type: Optional[str] = None,
+    limit: int = LEADS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    One page of filtered leads in `_id` order (keyset pagination: each page starts after the
+    last `_id` of the previous one, so deep pages cost the same as the first). Returns the
+    items and the `next_cursor` to pass back, or None on the last page.
+    Raises ValueError for a malformed cursor or field list.
+    """
+    query = build_leads_filter(state, type_, category, business_type)
+    if cursor:
+        query["_id"] = {"$gt": decode_leads_cursor(cursor)}
+
+    # One extra row tells us whether another page exists
+    leads = await db.leads.find(query, leads_projection(fields)).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(leads) > limit
+    leads = leads[:limit]
+    next_cursor = encode_leads_cursor(leads[-1]["_id"]) if has_more else None
+
+    for lead in leads:
+        lead["_id"] = str(lead["_id"])
+    return {"items": leads, "count": len(leads), "next_cursor": next_cursor}
+
+
+def _json_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_value, separators=(",", ":"))
+    if isinstance(value, (ObjectId, datetime)):
+        return _json_value(value)
+    return value
+
+
+async def _lead_batches(find, batch_size: int):
+    batch = []
+    async for doc in find:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _ndjson_chunks(batches):
+    async for batch in batches:
+        yield "".join(json.dumps(doc, default=_json_value, separators=(",", ":")) + "\n" for doc in batch)
+
+
+async def _csv_chunks(batches, columns: Optional[list]):
+    # Without a `fields` list the header is taken from the first batch; later extra fields are dropped
+    header_written = False
+    async for batch in batches:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            columns = columns or list(dict.fromkeys(key for doc in batch for key in doc))
+            writer.writerow(columns)
+            header_written = True
+        for doc in batch:
+            writer.writerow([_csv_cell(doc.get(column)) for column in columns])
+        yield buffer.getvalue()
+
+    if not header_written and columns:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(columns)
+        yield buffer.getvalue()
+
+
+def stream_leads(
+    db: AsyncIOMotorDatabase,
+    output_format: str,
+    state: Optional[str] = None,
+    type_: Optional[str] = None,
+    category: Optional[str] = None,
+    business_type: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    batch_size: int = LEADS_STREAM_BATCH_SIZE
+):
+    """
+    Every matching lead (or the first `limit`) in `_id` order as an async iterator of
+    'ndjson' or 'csv' text chunks, one per `batch_size` documents, so memory stays flat
+    however many rows are exported. `cursor` resumes after a page's `next_cursor`.
+    Arguments are validated here, before streaming starts: raises ValueError like get_leads_page.
+    """
+    query = build_leads_filter(state, type_, category, business_type)
+    if cursor:
+        query["_id"] = {"$gt": decode_leads_cursor(cursor)}
+    projection = leads_projection(fields)
+
+    find = db.leads.find(query, projection).sort("_id", 1).batch_size(batch_size)
+    if limit:
+        find = find.limit(limit)
+    batches = _lead_batches(find, batch_size)
 
-    leads = await db.leads.find(query).to_list(length=1000)
-    return leads
+    if output_format == "ndjson":
+        return _ndjson_chunks(batches)
+    if output_format == "csv":
+        return _csv_chunks(batches, list(projection) if projection else None)
+    raise ValueError(f"Unsupported stream format: {output_format}")
 
 
 # Get a single lead by place_id
 async def get_lead_by_place_id(db: AsyncIOMotorDatabase, place_id: str):
     return await db.leads.find_one({"place_id": place_id})
 
-# Delete a lead by ObjectId (if needed for dashboard cleanup)
+# Delete a lead by ObjectId (if needed for dashboard cleanup); returns the deleted lead or None
 async def delete_lead_by_id(db: AsyncIOMotorDatabase, lead_id: str):
-    return await db.leads.delete_one({"_id": ObjectId(lead_id)})
+    lead = await db.leads.find_one_and_delete({"_id": ObjectId(lead_id)})
+    if lead and LEAD_STATS_ENABLED:
+        deltas = Counter({(TOTAL, None, None): -1})
+        count_lead(deltas, lead.get("state"), lead.get("types"), -1)
+        await apply_lead_stats(db, deltas)
+    if lead:
+        get_response_cache().invalidate()
+    return lead
 
 
 # Export data to Excel
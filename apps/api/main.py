@@ -7,8 +7,10 @@ import asyncio
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
-from routes import business
+from routes import business, regions
 from db.mongo import init_db_indexes
+from utils.http_client import close_http_client
+from utils.region_search import get_region_search_index
 
 load_dotenv()
 
@@ -29,9 +31,19 @@ app.add_middleware(
 
 # Register routes
 app.include_router(business.router, prefix="/api/business", tags=["Business"])
+app.include_router(regions.router, prefix="/api/regions", tags=["Regions"])
 
 # Run Mongo index setup at startup
 @app.on_event("startup")
 async def startup_event():
-    await init_db_indexes()
-    print("App started and DB indexes checked.")
+    # Index builds on a large collection can take a while; run them without holding up startup
+    app.state.index_build = asyncio.create_task(init_db_indexes())
+    # Build the region autocomplete index up front so the first lookup is as fast as the rest
+    await asyncio.to_thread(get_region_search_index)
+    print("App started; DB indexes are being ensured in the background.")
+
+
+# Release pooled Google API connections on shutdown
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_http_client()
@@ -1,19 +1,26 @@
-import json
-from fastapi import APIRouter, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from services.google_maps import GoogleMapsService
 from services.business_manager import BusinessManager
-from config.constants import REGION_COORDINATES, AU_REGIONS, BUSINESS_CATEGORIES, ALL_BUSINESS_TYPES, GCCSA_REGIONS, REGIONS_PATH, GEO_KEY_REGION_NAME, GCCSA_PATH, LGA_PATH
-from utils.helpers import generate_tiles_for_australia
+from config.constants import REGION_COORDINATES, AU_REGIONS, BUSINESS_CATEGORIES, ALL_BUSINESS_TYPES, GCCSA_REGIONS, GEO_KEY_REGION_NAME
+from utils.helpers import generate_tiles_for_australia, iter_region_plans
+from utils.geo_index import get_geometry_index
+from utils.tile_dedup import TileDeduplicator
 from db.queries import export_to_excel
-from typing import List, Optional
+from typing import List, Literal, Optional
+from config.settings import ADAPTIVE_ROOT_TILE_SCALE, LEADS_PAGE_SIZE, LEADS_MAX_PAGE_SIZE, LEAD_STATS_ENABLED
 from collections import defaultdict
-from db.mongo import leads_collection, db
-from itertools import chain
-from db.queries import get_leads_by_filter
+from db.mongo import leads_collection, db, index_usage_report
+from itertools import chain, islice
+from db.queries import get_leads_page, stream_leads
+from db.lead_stats import read_lead_summary
+from utils.response_cache import get_response_cache
 
 router = APIRouter()
 google_maps = GoogleMapsService()
-business_manager = BusinessManager()
+business_manager = BusinessManager(maps_service=google_maps)
+response_cache = get_response_cache()
 
 
 @router.get("/crawl")
@@ -33,7 +40,7 @@ async def crawl_businesses(
 
     for business_type in types:
         try:
-            places = google_maps.search_places_nearby(
+            places = await google_maps.search_places_nearby(
                 location=location,
                 radius=5000,
                 place_type=business_type
@@ -57,25 +64,21 @@ async def crawl_all_regions_route(
     Automatically crawl all configured states/regions/types.
     Use dry_run=True to simulate the crawl without DB writes.
     """
-    total_saved = 0
-    errors = []
-    regions_processed = defaultdict(dict)
-    dry_run_plan = []
-
-    all_results = google_maps.crawl_all_regions(dry_run=dry_run)
+    batches = google_maps.crawl_all_regions(dry_run=dry_run)
 
     if dry_run:
-        for item in all_results:
-            place = item["place"]
-            dry_run_plan.append({
-                "name": place.get("displayName", {}).get("text"),
-                "location": place.get("formattedAddress"),
-                "types": place.get("types", []),
-                "state": item["state"],
-                "region": item["region"],
-                "category": item["category"],
-                "type": item["business_type"]
-            })
+        dry_run_plan = []
+        async for batch in batches:
+            for place in batch["places"]:
+                dry_run_plan.append({
+                    "name": place.get("displayName", {}).get("text"),
+                    "location": place.get("formattedAddress"),
+                    "types": place.get("types", []),
+                    "state": batch["state"],
+                    "region": batch["region"],
+                    "category": batch["category"],
+                    "type": batch["business_type"]
+                })
 
         return {
             "message": "✅ Dry run complete",
@@ -83,57 +86,89 @@ async def crawl_all_regions_route(
             "total_found": len(dry_run_plan)
         }
 
-    # Actual insert
-    for item in all_results:
-        try:
-            saved = await business_manager.save_crawled_batch(
-                places=[item["place"]],
-                state=item["state"],
-                region=item["region"],
-                category=item["category"],
-                business_type=item["business_type"]
-            )
-            total_saved += saved
-            regions_processed[item["region"]][item["business_type"]] = saved
-
-        except Exception as e:
-            errors.append({
-                "place_id": item["place"].get("place_id") or item["place"].get("id"),
-                "error": str(e)
-            })
+    # Actual insert: each batch is written while the crawler fetches the next one
+    result = await business_manager.persist_batches(batches)
 
     return {
         "message": "✅ Full crawl completed",
-        "total_saved": total_saved,
-        "regions_processed": regions_processed,
-        "errors": errors
+        **result
     }
 
 
 
+@router.get("/crawl/keys")
+async def api_key_health():
+    """
+    Per-key request, 429, error and latency stats from the shared API key pool,
+    plus the state of each Places endpoint's circuit breaker.
+    """
+    return {
+        "keys": google_maps.key_manager.stats(),
+        "circuits": [breaker.summary() for breaker in google_maps.breakers.values()]
+    }
+
+
 @router.get("/leads")
 async def get_leads_route(
     state: Optional[str] = None,
     type: Optional[str] = None,
     category: Optional[str] = None,
-    business_type: Optional[str] = None
+    business_type: Optional[str] = None,
+    limit: Optional[int] = Query(
+        None, ge=1,
+        description="json: leads per page (default LEADS_PAGE_SIZE, max LEADS_MAX_PAGE_SIZE); ndjson/csv: total rows (default all)"
+    ),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    format: Literal["json", "ndjson", "csv"] = Query("json", description="json pages, or a streamed ndjson/csv export")
 ):
     """
-    Retrieve stored leads with advanced filters (state, category, type, business_type).
+    Retrieve stored leads with advanced filters (state, category, type, business_type),
+    one page at a time. Follow `next_cursor` until it is null to read every match, or
+    use format=ndjson / format=csv to stream every match in one response.
     """
-    leads = await get_leads_by_filter(
-        db=db,  # ✅ Correct full DB object
-        state=state,
-        type_=type,
-        category=category,
-        business_type=business_type
-    )
-
-    # Convert ObjectIds to string
-    for lead in leads:
-        lead["_id"] = str(lead["_id"])
-
-    return leads
+    try:
+        if format != "json":
+            chunks = stream_leads(
+                db=db,
+                output_format=format,
+                state=state,
+                type_=type,
+                category=category,
+                business_type=business_type,
+                limit=limit,
+                cursor=cursor,
+                fields=fields
+            )
+            if format == "csv":
+                return StreamingResponse(
+                    chunks, media_type="text/csv",
+                    headers={"Content-Disposition": 'attachment; filename="leads.csv"'}
+                )
+            return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+        limit = limit or LEADS_PAGE_SIZE
+        if limit > LEADS_MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be at most {LEADS_MAX_PAGE_SIZE} for json pages; use format=ndjson or csv for bulk exports")
+        params = {
+            "state": state, "type": type, "category": category, "business_type": business_type,
+            "limit": limit, "cursor": cursor, "fields": fields
+        }
+        return await response_cache.get_or_load(
+            response_cache.make_key("leads", params),
+            lambda: get_leads_page(
+                db=db,
+                state=state,
+                type_=type,
+                category=category,
+                business_type=business_type,
+                limit=limit,
+                cursor=cursor,
+                fields=fields
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/leads/summary")
@@ -141,15 +176,30 @@ async def leads_summary(
     state: Optional[str] = Query(None),
     business_type: Optional[str] = Query(None)
 ):
+    return await response_cache.get_or_load(
+        response_cache.make_key("leads/summary", {"state": state, "business_type": business_type}),
+        lambda: build_leads_summary(state, business_type)
+    )
+
+
+async def build_leads_summary(state: Optional[str], business_type: Optional[str]):
     VALID_BUSINESS_TYPES = set(chain.from_iterable(BUSINESS_CATEGORIES.values()))
 
+    # Materialized counters when available: O(states x types) instead of scanning every lead
+    if LEAD_STATS_ENABLED:
+        materialized = await read_lead_summary(db, state, business_type, VALID_BUSINESS_TYPES)
+        if materialized is not None:
+            return materialized
+        print("⚠️ lead_stats has not been built yet, aggregating the summary from leads. Build it with: python -m db.migrations rebuild_lead_stats")
+
     # === Main Summary Aggregation from `types` array ===
+    # Only the configured business types; an explicit business_type narrows that, never widens it
+    summary_types = VALID_BUSINESS_TYPES & {business_type} if business_type else VALID_BUSINESS_TYPES
     pipeline = [
         {"$unwind": "$types"},
         {"$match": {
-            "types": {"$in": list(VALID_BUSINESS_TYPES)},
-            **({"state": state} if state else {}),
-            **({"types": business_type} if business_type else {})
+            "types": {"$in": list(summary_types)},
+            **({"state": state} if state else {})
         }},
         {
             "$group": {
@@ -191,14 +241,17 @@ async def crawl_text_search_custom_route(
     state: str = Query(..., description="Australian state"),
     region: str = Query(..., description="City or region within the state"),
     geojson_type: str = Query("regions", description="GeoJSON source type: 'regions', 'gccsa', or 'lga'"),
-    dry_run: bool = False
+    dry_run: bool = False,
+    bypass_cache: bool = Query(False, description="Skip cached Places responses and re-bill every page"),
+    adaptive: bool = Query(False, description="Start from coarse tiles and split only those that saturate")
 ):
-    # Generate tiles
+    # Generate tiles (coarser roots in adaptive mode; saturated tiles are split during the crawl)
     tiles = generate_tiles_for_australia(
         tile_km=10,
         geojson_source=geojson_type,
         target_region=region,
-        state_name=state
+        state_name=state,
+        tile_scale=ADAPTIVE_ROOT_TILE_SCALE if adaptive else 1.0
     )
 
     if not tiles:
@@ -212,7 +265,7 @@ async def crawl_text_search_custom_route(
             "tiles_generated": len(tiles),
             "tiles": tiles,
             "dry_run": True,
-            "api_requests_total": 0
+            "api_requests_total": {"billed": 0, "cached": 0}
         }
 
     # Handle ALL business types
@@ -221,19 +274,23 @@ async def crawl_text_search_custom_route(
         failures = []
         details = []
         combined_saved_data = []
-        api_requests_grand_total = 0
+        api_requests_grand_total = {"billed": 0, "cached": 0}
+        db_writes_total = {"inserted": 0, "matched": 0, "modified": 0}
 
         for btype in ALL_BUSINESS_TYPES:
             try:
                 print(f"🚀 Crawling for business type: {btype}")
                 result = await business_manager.crawl_custom_text_search(
-                    btype, state, region, tiles, dry_run
+                    btype, state, region, tiles, dry_run, bypass_cache=bypass_cache, adaptive=adaptive
                 )
                 results.append(result)
                 failures.extend(result.get("failures", []))
                 details.extend(result.get("details", []))
                 combined_saved_data.extend(result.get("saved_data", []))
-                api_requests_grand_total += result.get("api_requests_total", 0)
+                for kind, count in result.get("api_requests_total", {}).items():
+                    api_requests_grand_total[kind] += count
+                for kind, count in result.get("db_writes", {}).items():
+                    db_writes_total[kind] += count
             except Exception as e:
                 print(f"❌ Error while crawling '{btype}': {str(e)}")
                 failures.append({"business_type": btype, "error": str(e)})
@@ -255,11 +312,14 @@ async def crawl_text_search_custom_route(
             "tiles_generated": len(tiles),
             "tiles": tiles,
             "excel_file": excel_path,
-            "api_requests_total": api_requests_grand_total  # ✅ surfaced
+            "api_requests_total": api_requests_grand_total,  # ✅ surfaced
+            "db_writes": db_writes_total
         }
 
     # Single business type
-    result = await business_manager.crawl_custom_text_search(query, state, region, tiles, dry_run)
+    result = await business_manager.crawl_custom_text_search(
+        query, state, region, tiles, dry_run, bypass_cache=bypass_cache, adaptive=adaptive
+    )
 
     excel_path = export_to_excel(
         data=result.get("saved_data", []),
@@ -278,49 +338,20 @@ async def crawl_text_search_custom_route(
         "tiles_generated": len(tiles),
         "tiles": tiles,
         "excel_file": excel_path,
-        "api_requests_total": result.get("api_requests_total", 0)
+        "api_requests_total": result.get("api_requests_total", {"billed": 0, "cached": 0}),
+        "db_writes": result.get("db_writes", {})
     }
 
 
-
-
-@router.get("/crawl/textsearch/full")
-async def crawl_text_search_full_route(
-    dry_run: bool = False,
-    limit_tiles: int = 0,
-    geojson_type: str = Query("gccsa", description="GeoJSON source: 'gccsa', 'regions', or 'lga'")
-):
+def full_crawl_regions(geo_index) -> list:
     """
-    Crawl all business types across AU using text search.
-    Supports tile generation from gccsa, regions, or lga GeoJSON files.
+    Regions to crawl as (region_name, state_name), state by state, based on the geojson type.
     """
-
-    geojson_type = geojson_type.lower()
-    if geojson_type not in {"gccsa", "regions", "lga"}:
-        return {"error": "Invalid geojson_type. Must be one of 'gccsa', 'regions', or 'lga'."}
-
-    all_types = ALL_BUSINESS_TYPES
-    all_tiles = []
-
-    # Map geojson type to path
-    geojson_path_map = {
-        "gccsa": GCCSA_PATH,
-        "regions": REGIONS_PATH,
-        "lga": LGA_PATH
-    }
-    geojson_path = geojson_path_map[geojson_type]
-
-    # Load geojson file
-    try:
-        with open(geojson_path, "r", encoding="utf-8") as f:
-            geojson_data = json.load(f)
-    except Exception as e:
-        return {"error": f"Failed to load GeoJSON file: {str(e)}"}
-
+    geojson_type = geo_index.source
     # State names list for filtering in all geojsons (keys of GCCSA_REGIONS)
     states_list = list(GCCSA_REGIONS.keys())
+    regions = []
 
-    # Generate tiles based on geojson type
     for state_name in states_list:
         # Filter features by state (key varies per geojson)
         if geojson_type == "gccsa":
@@ -328,128 +359,217 @@ async def crawl_text_search_full_route(
             gccsa_regions = GCCSA_REGIONS.get(state_name, [])
             for gccsa_region in gccsa_regions:
                 features = [
-                    feat for feat in geojson_data["features"]
-                    if feat["properties"].get("STE_NAME21") == state_name and
-                       feat["properties"].get("GCC_NAME21") == gccsa_region
+                    props for props in geo_index.features
+                    if props.get("STE_NAME21") == state_name and
+                       props.get("GCC_NAME21") == gccsa_region
                 ]
                 for feature in features:
-                    region_name = feature["properties"].get("GCC_NAME21")
+                    region_name = feature.get("GCC_NAME21")
                     if region_name:
-                        try:
-                            tiles = generate_tiles_for_australia(
-                                tile_km=10,
-                                geojson_source=geojson_type,
-                                target_region=region_name,
-                                state_name=state_name
-                            )
-                            all_tiles.extend(tiles)
-                        except Exception as e:
-                            print(f"[TileGen ERROR] {region_name}: {e}")
+                        regions.append((region_name, state_name))
 
         elif geojson_type == "regions":
             # regions geojson: filter by state only, generate tiles per SA2_NAME21 region
             features = [
-                feat for feat in geojson_data["features"]
-                if feat["properties"].get("STE_NAME21") == state_name
+                props for props in geo_index.features
+                if props.get("STE_NAME21") == state_name
             ]
             for feature in features:
-                region_name = feature["properties"].get("SA2_NAME21")
+                region_name = feature.get("SA2_NAME21")
                 if region_name:
-                    try:
-                        tiles = generate_tiles_for_australia(
-                            tile_km=10,
-                            geojson_source=geojson_type,
-                            target_region=region_name,
-                            state_name=state_name
-                        )
-                        all_tiles.extend(tiles)
-                    except Exception as e:
-                        print(f"[TileGen ERROR] {region_name}: {e}")
+                    regions.append((region_name, state_name))
 
         elif geojson_type == "lga":
             # lga geojson: filter by state, generate tiles per LGA_NAME24
             features = [
-                feat for feat in geojson_data["features"]
-                if feat["properties"].get("STE_NAME21") == state_name
+                props for props in geo_index.features
+                if props.get("STE_NAME21") == state_name
             ]
             for feature in features:
-                region_name = feature["properties"].get("LGA_NAME24")
+                region_name = feature.get("LGA_NAME24")
                 if region_name:
-                    try:
-                        tiles = generate_tiles_for_australia(
-                            tile_km=10,
-                            geojson_source=geojson_type,
-                            target_region=region_name,
-                            state_name=state_name
-                        )
-                        all_tiles.extend(tiles)
-                    except Exception as e:
-                        print(f"[TileGen ERROR] {region_name}: {e}")
+                    regions.append((region_name, state_name))
+    return regions
+
+
+def full_crawl_tiles(geo_index, tile_scale: float = 1.0, deduplicator: TileDeduplicator = None, workers: int = None):
+    """
+    Lazy tile stream for the full crawl: every region from full_crawl_regions(), planned on the
+    tile-planning process pool (see iter_region_plans) and streamed back in region order,
+    then passed through `deduplicator` if one is given.
+    """
+    regions = full_crawl_regions(geo_index)
+
+    def region_plans():
+        for batch in iter_region_plans(geo_index.source, regions, tile_scale, workers):
+            for region_name, region_tiles, error in batch:
+                if error is not None:
+                    print(f"[TileGen ERROR] {region_name}: {error}")
+                yield region_tiles
+
+    if deduplicator is None:
+        yield from chain.from_iterable(region_plans())
+        return
+
+    # Every region's extent up front, so a kept tile is released only once no region
+    # planned after it can still be merged into it
+    geoms = [geo_index.get(region_name) for region_name, _ in regions]
+    yield from deduplicator.deduplicate(region_plans(), [geom.bounds if geom is not None else None for geom in geoms])
+
+
+@router.get("/crawl/textsearch/full")
+async def crawl_text_search_full_route(
+    dry_run: bool = False,
+    limit_tiles: int = 0,
+    geojson_type: str = Query("gccsa", description="GeoJSON source: 'gccsa', 'regions', or 'lga'"),
+    bypass_cache: bool = Query(False, description="Skip cached Places responses and re-bill every page"),
+    adaptive: bool = Query(False, description="Start from coarse tiles and split only those that saturate"),
+    dedupe: bool = Query(True, description="Drop tiles already covered by neighbouring regions' tiles")
+):
+    """
+    Crawl all business types across AU using text search.
+    Supports tile generation from gccsa, regions, or lga GeoJSON files.
+    """
+    tile_scale = ADAPTIVE_ROOT_TILE_SCALE if adaptive else 1.0
+
+    geojson_type = geojson_type.lower()
+    if geojson_type not in {"gccsa", "regions", "lga"}:
+        return {"error": "Invalid geojson_type. Must be one of 'gccsa', 'regions', or 'lga'."}
+
+    all_types = ALL_BUSINESS_TYPES
+
+    # Parsed once per process and shared with the tile generator
+    try:
+        geo_index = get_geometry_index(geojson_type)
+    except Exception as e:
+        return {"error": f"Failed to load GeoJSON file: {str(e)}"}
+
+    # Tiles stay a lazy stream: planning, dedup, limit and the crawl all consume them as they are planned.
+    # Dedup merges overlapping tiles across region boundaries; each redundant tile costs one search per business type
+    deduplicator = TileDeduplicator() if dedupe else None
+    tiles = full_crawl_tiles(geo_index, tile_scale, deduplicator)
 
     # Apply limit if requested
     if limit_tiles > 0:
-        all_tiles = all_tiles[:limit_tiles]
+        tiles = islice(tiles, limit_tiles)
+
+    tile_count = 0
 
-    if not all_tiles:
+    def counted(stream):
+        nonlocal tile_count
+        for tile in stream:
+            tile_count += 1
+            yield tile
+
+    tiles = counted(tiles)
+
+    # Plan just the first tile up front (off the event loop) to fail fast on an empty plan
+    first_tile = await asyncio.to_thread(next, tiles, None)
+    if first_tile is None:
         return {"error": "No tiles generated."}
+    tiles = chain([first_tile], tiles)
 
-    total_saved = 0
-    total_tiles = 0
-    all_failures = []
-    all_details = []
+    def planning_stats():
+        if deduplicator:
+            return deduplicator.stats()
+        return {"tiles_planned": tile_count, "tiles_kept": tile_count, "tiles_deduplicated": 0}
 
     if dry_run:
+        # Planning the rest of the country is CPU-bound; drain it (already capped by limit_tiles) off the event loop
+        planned = await asyncio.to_thread(list, tiles)
         simulated_calls = []
-        for btype in all_types:
-            result = await business_manager.crawl_using_text_search(btype, all_tiles, dry_run=True)
-            simulated_calls.extend(result.get("details", []))
-            all_failures.extend(result.get("failures", []))
-            all_details.extend(result.get("details", []))
+        for tile in planned:
+            for btype in all_types:
+                simulated_calls.append({
+                    "region": tile.get("region"),
+                    "state": tile.get("state"),
+                    "business_type": btype,
+                    "tile_name": tile.get("tile_name"),
+                    "simulated_request": True
+                })
 
         return {
             "message": f"✅ DRY RUN: Simulation complete using {geojson_type}",
             "total_business_types": len(all_types),
-            "total_tiles": len(all_tiles),
+            "total_tiles": tile_count,
+            "tile_planning": planning_stats(),
             "total_simulated_requests": len(simulated_calls),
             "planned_requests_sample": simulated_calls[:10],
-            "failures": all_failures,
-            "details": all_details,
+            "failures": [],
+            "details": simulated_calls,
             "note": "No actual API or DB requests were made."
         }
 
-    # Real crawl
-    for btype in all_types:
-        print(f"Real crawl: {btype}")
-        result = await business_manager.crawl_using_text_search(btype, all_tiles, dry_run=False)
-        total_saved += result.get("total_saved", 0)
-        total_tiles += result.get("tiles_scanned", 0)
-        all_failures.extend(result.get("failures", []))
-        all_details.extend(result.get("details", []))
+    # Real crawl: every tile is searched for all business types as soon as it is planned
+    result = await business_manager.crawl_text_search_stream(
+        tiles, all_types, bypass_cache=bypass_cache, adaptive=adaptive
+    )
 
     return {
         "message": f"✅ Full AU-wide text search crawl completed using {geojson_type}.",
-        "total_saved": total_saved,
-        "tiles_scanned": total_tiles,
-        "failures": all_failures,
-        "details": all_details,
-        "total_business_types": len(all_types)
+        "total_saved": result["total_saved"],
+        "total_tiles": tile_count,
+        "tiles_scanned": result["tiles_scanned"],
+        "tile_planning": planning_stats(),
+        "failures": result["failures"],
+        "details": result["details"],
+        "total_business_types": len(all_types),
+        "api_requests_total": result["api_requests_total"],
+        "db_writes": result["db_writes"]
     }
 
 
 
 
 @router.get("/leads/crawl/textsearch/coverage")
-async def check_coverage(state: Optional[str] = None, region: Optional[str] = None):
+async def check_coverage(
+    state: Optional[str] = None,
+    region: Optional[str] = None,
+    sa2_code: Optional[str] = Query(None, description="Leads inside this SA2 polygon"),
+    lga_code: Optional[str] = Query(None, description="Leads inside this LGA polygon"),
+    gccsa_code: Optional[str] = Query(None, description="Leads inside this GCCSA polygon")
+):
+    params = {"state": state, "region": region, "sa2_code": sa2_code, "lga_code": lga_code, "gccsa_code": gccsa_code}
+    return await response_cache.get_or_load(
+        response_cache.make_key("leads/crawl/textsearch/coverage", params),
+        lambda: build_coverage(**params)
+    )
+
+
+async def build_coverage(
+    state: Optional[str],
+    region: Optional[str],
+    sa2_code: Optional[str],
+    lga_code: Optional[str],
+    gccsa_code: Optional[str]
+):
     query = {}
     if state:
         query["state"] = state
     if region:
         query["region"] = region
+    # Polygon membership tagged at ingest, independent of which tile found the lead
+    membership = {
+        field: value
+        for field, value in (("sa2_code", sa2_code), ("lga_code", lga_code), ("gccsa_code", gccsa_code))
+        if value
+    }
+    query.update(membership)
 
     count = await db.leads.count_documents(query)
 
     return {
         "region": region or "All Regions",
         "state": state or "All States",
+        **membership,
         "total_leads": count
     }
+
+
+@router.get("/leads/indexes")
+async def leads_index_usage():
+    """
+    Usage of every index on the leads collection (ops served, declared or not, still building),
+    for spotting missing builds and indexes no query uses.
+    """
+    return {"indexes": await index_usage_report()}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from utils.region_search import REGION_TYPE_SOURCES, get_region_search_index
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search_regions(
+    q: str = Query("", description="Partial region name; empty lists every match alphabetically"),
+    type: Optional[List[str]] = Query(None, description="Region types to include: 'sa2', 'lga', 'gccsa'"),
+    state: Optional[str] = Query(None, description="Only regions in this state (e.g., Victoria)"),
+    limit: int = Query(10, ge=1, le=1000)
+):
+    """
+    Region autocomplete over SA2, LGA and GCCSA names. Each match carries the `source`
+    to pass as `geojson_type` when crawling it.
+    """
+    unknown = [t for t in type or [] if t not in REGION_TYPE_SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown region type(s): {', '.join(unknown)}")
+
+    results = get_region_search_index().search(q, limit=limit, types=type, state=state)
+    return {"query": q, "count": len(results), "results": results}
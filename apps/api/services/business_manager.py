@@ -1,36 +1,50 @@
+import asyncio
+import time
+from collections import deque, defaultdict
+from itertools import count
 from db.mongo import db
-from db.queries import is_duplicate, insert_lead, insert_leads_batch, export_to_excel
-from utils.helpers import transform_place_result, generate_tiles_for_australia
+from db.queries import bulk_upsert_leads, export_to_excel
+from utils.helpers import transform_place_result, generate_tiles_for_australia, split_tile, tile_height_km
 from services.google_maps import GoogleMapsService
+from utils.retry import PlacesRequestError
+from utils.geo_index import tile_region_geometry
+from config.settings import (
+    CRAWL_MAX_CONCURRENT_TILES,
+    CRAWL_MAX_CONCURRENT_TILES_PER_KEY,
+    CRAWL_TILE_MAX_REQUEUES,
+    CRAWL_WRITE_QUEUE_SIZE,
+    ADAPTIVE_MAX_DEPTH,
+    ADAPTIVE_MIN_TILE_KM,
+    PLACES_POLYGON_FILTER_ENABLED
+)
 
 class BusinessManager:
-    def __init__(self):
-        pass
+    def __init__(self, maps_service: GoogleMapsService = None):
+        # Share one service (and its pooled HTTP client) across every crawl
+        self.maps_service = maps_service or GoogleMapsService()
 
     async def filter_and_save_results(self, results: list, state: str, region: str):
         """
         Manual insert version (called by the user during testing).
-        Processes one place at a time, filtering duplicates and inserting individually.
+        Upserts the whole result set in one bulk write and returns the number of new leads.
         """
-        count = 0
+        processed = []
         for result in results:
             place_id = result.get("place_id") or result.get("id")
-
-            if not place_id or await is_duplicate(db, place_id):
+            if not place_id:
                 continue
-            
-            print(result)
+
             business_data = transform_place_result(result)
             business_data["state"] = state
             business_data["region"] = region
+            processed.append(business_data)
 
-            await insert_lead(db, business_data)
-            count += 1
-        return count
+        write_result = await bulk_upsert_leads(db, processed)
+        return write_result["inserted"]
 
     async def save_crawled_batch(self, places: list, state: str, region: str, category: str, business_type: str):
         """
-        For automated batch insertion from crawler. Uses batch insert with deduplication.
+        For automated batch insertion from crawler. Uses a bulk upsert keyed on place_id.
         """
         processed = []
         for place in places:
@@ -47,111 +61,327 @@ class BusinessManager:
 
             processed.append(business_data)
 
-        inserted_count = await insert_leads_batch(db, processed)
-        return inserted_count
+        write_result = await bulk_upsert_leads(db, processed)
+        return write_result["inserted"]
 
 
-    async def crawl_using_text_search(self, search_query: str, tiles: list, dry_run: bool = False):
+    async def persist_batches(self, batches):
+        """
+        Writer stage for streamed crawls. Consumes an async iterator of
+        {"places", "state", "region", "category", "business_type"} batches and saves each one
+        as it arrives through a bounded queue, so fetching and writing overlap and memory stays flat.
+        """
+        queue = asyncio.Queue(maxsize=CRAWL_WRITE_QUEUE_SIZE)
         total_saved = 0
-        failures = []
-        detailed_results = []
-        dry_run_summary = []
+        errors = []
+        regions_processed = defaultdict(dict)
 
-        if dry_run:
-            for tile in tiles:
-                dry_run_summary.append({
-                    "region": tile.get("region"),
-                    "state": tile.get("state"),
-                    "business_type": search_query,
-                    "tile_name": tile.get("tile_name"),
-                    "simulated_request": True
-                })
-            return {
-                "message": "✅ Dry run simulation complete",
-                "total_saved": 0,
-                "tiles_scanned": len(tiles),
-                "failures": [],
-                "details": dry_run_summary
-            }
+        async def produce():
+            try:
+                async for batch in batches:
+                    await queue.put(batch)
+            finally:
+                await queue.put(None)
+
+        async def consume():
+            nonlocal total_saved
+            while (batch := await queue.get()) is not None:
+                try:
+                    saved = await self.save_crawled_batch(
+                        places=batch["places"],
+                        state=batch["state"],
+                        region=batch["region"],
+                        category=batch["category"],
+                        business_type=batch["business_type"]
+                    )
+                    total_saved += saved
+                    regions_processed[batch["region"]][batch["business_type"]] = saved
+                except Exception as e:
+                    errors.append({
+                        "region": batch["region"],
+                        "business_type": batch["business_type"],
+                        "places": len(batch["places"]),
+                        "error": str(e)
+                    })
 
-        maps_service = GoogleMapsService()
+        producer = asyncio.create_task(produce())
+        try:
+            await consume()
+        except BaseException:
+            producer.cancel()
+            raise
 
-        for tile in tiles:
-            location_bias = {
-                "rectangle": {
-                    "low": tile.get("low"),
-                    "high": tile.get("high")
-                }
-            }
-
-            try:
-                print(f"\n📍 Tile: {tile.get('region')} ({tile.get('state')}), Query: '{search_query}'")
+        # Surface crawler failures (the writer has already saved everything before them)
+        crawl_error = (await asyncio.gather(producer, return_exceptions=True))[0]
+        if isinstance(crawl_error, Exception):
+            errors.append({"error": f"Crawl stopped early: {crawl_error}"})
 
-                result_data = maps_service.text_search_places(
-                    text_query=search_query,
-                    location_bias=location_bias,
-                    max_results=20
-                )
+        return {
+            "total_saved": total_saved,
+            "regions_processed": regions_processed,
+            "errors": errors
+        }
 
-                results = result_data.get("results", [])
-                pages_fetched = result_data.get("pages_fetched", 0)
-                count = 0
+    def _max_concurrent_tiles(self) -> int:
+        """
+        Concurrency for tile crawls: capped globally and scaled by the number of API keys.
+        """
+        key_count = len(self.maps_service.key_manager.api_keys)
+        return max(1, min(CRAWL_MAX_CONCURRENT_TILES, CRAWL_MAX_CONCURRENT_TILES_PER_KEY * key_count))
 
-                for result in results:
-                    place_id = result.get("place_id") or result.get("id")
-                    if not place_id or await is_duplicate(db, place_id):
+    async def _run_tiles(self, tiles, worker, on_result=None, expand=None):
+        """
+        Runs `worker(tile)` over all tiles with bounded concurrency.
+        `tiles` may be a list or any iterator, e.g. a tile generator that is still planning;
+        iterators are pulled lazily and off the event loop, one tile per free worker.
+        Tiles that fail with a transient Places error are re-queued at the back, up to
+        CRAWL_TILE_MAX_REQUEUES times, instead of losing their pages.
+        With `expand`, expand(tile, outcome) may return follow-up tiles for a finished tile;
+        they go straight onto the queue ahead of new input tiles.
+        Returns a list of (tile, outcome, error) tuples, input tiles in input order followed by
+        follow-up tiles in the order they were queued. With `on_result`, each tuple is handed to
+        on_result(tile, outcome, error) as it finishes instead of being kept.
+        """
+        results = {}
+        lazy = not isinstance(tiles, (list, tuple))
+        pending = enumerate(tiles)
+        exhausted = False
+        pull_lock = asyncio.Lock()
+        requeued = deque()  # (key, tile, requeues, not_before)
+        follow_ups = deque()
+        follow_up_keys = count()
+        # Tiles being worked on: while any is, it may still queue follow-ups or a re-queue
+        active = 0
+        work_changed = asyncio.Event()
+
+        async def next_item():
+            nonlocal exhausted, active
+            while True:
+                if requeued:
+                    item = requeued.popleft()
+                elif follow_ups:
+                    item = follow_ups.popleft()
+                elif not exhausted:
+                    if lazy:
+                        # Planning happens inside next(); keep it off the loop and one pull at a time
+                        async with pull_lock:
+                            index, tile = await asyncio.to_thread(next, pending, (None, None))
+                    else:
+                        index, tile = next(pending, (None, None))
+                    if tile is None:
+                        exhausted = True
                         continue
+                    item = ((0, index), tile, 0, 0.0)
+                elif active:
+                    # Idle until a running tile finishes, rather than exit and lose a worker
+                    work_changed.clear()
+                    await work_changed.wait()
+                    continue
+                else:
+                    return None
+                active += 1
+                return item
+
+        def finish(key, tile, outcome, error):
+            if on_result:
+                on_result(tile, outcome, error)
+            else:
+                results[key] = (tile, outcome, error)
+            if expand and not error:
+                try:
+                    children = expand(tile, outcome)
+                except Exception as e:
+                    # The tile itself is already reported; only its follow-ups are lost
+                    print(f"⚠️ Could not queue follow-up tiles for {tile.get('tile_name')}: {e}")
+                    return
+                follow_ups.extend(((1, next(follow_up_keys)), child, 0, 0.0) for child in children)
+
+        async def drain():
+            nonlocal active
+            # Each runner pulls the next tile as soon as it finishes its current one
+            while (item := await next_item()) is not None:
+                key, tile, requeues, not_before = item
+                try:
+                    # Only the worker's own failures are caught here, so each tile is reported once
+                    try:
+                        delay = not_before - time.monotonic()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        outcome = await worker(tile)
+                    except PlacesRequestError as e:
+                        if requeues < CRAWL_TILE_MAX_REQUEUES:
+                            print(f"↩️ Re-queueing tile {tile.get('tile_name')} after transient error: {e}")
+                            requeued.append((key, tile, requeues + 1, time.monotonic() + max(e.retry_in, 1.0)))
+                        else:
+                            finish(key, tile, None, e)
+                    except Exception as e:
+                        finish(key, tile, None, e)
+                    else:
+                        finish(key, tile, outcome, None)
+                finally:
+                    active -= 1
+                    work_changed.set()
+
+        if lazy:
+            runners = self._max_concurrent_tiles()
+            print(f"🧵 Crawling tiles as they are planned with {runners} concurrent workers")
+        else:
+            runners = self._max_concurrent_tiles() if expand else min(self._max_concurrent_tiles(), len(tiles))
+            print(f"🧵 Crawling {len(tiles)} tiles with {runners} concurrent workers")
+        await asyncio.gather(*(drain() for _ in range(runners)))
+        return [results[key] for key in sorted(results)]
+
+    async def _run_adaptive_tiles(self, tiles, worker, on_result=None):
+        """
+        Quadtree crawl: every tile whose search hit Google's result cap is split into quadrants
+        as soon as its result arrives, and the quadrants join the same worker queue. Sparse tiles
+        stop descending right away; saturated ones stop at ADAPTIVE_MAX_DEPTH or ADAPTIVE_MIN_TILE_KM.
+        Returns (tile, outcome, error) tuples for every tile crawled, roots first
+        (or passes each one to `on_result` as it finishes).
+        """
+        def split_saturated(tile, outcome):
+            if not outcome.get("saturated"):
+                return []
+            if tile.get("depth", 0) >= ADAPTIVE_MAX_DEPTH or tile_height_km(tile) / 2 < ADAPTIVE_MIN_TILE_KM:
+                print(f"⚠️ Tile {tile.get('tile_name')} is still saturated at its minimum size; results may be truncated")
+                return []
+            print(f"🔀 Splitting saturated tile {tile.get('tile_name')} into quadrants")
+            return split_tile(tile)
+
+        return await self._run_tiles(tiles, worker, on_result, expand=split_saturated)
+
+    async def _crawl_tiles(self, tiles, worker, adaptive: bool = False, on_result=None):
+        """
+        Returns (tile, outcome, error) tuples from either a flat or an adaptive crawl.
+        """
+        if adaptive:
+            return await self._run_adaptive_tiles(tiles, worker, on_result)
+        return await self._run_tiles(tiles, worker, on_result)
 
-                    business_data = transform_place_result(result)
-                    business_data.update({
-                        "state": tile.get("state"),
-                        "region": tile.get("region"),
-                        "category": "TextSearch",
-                        "business_type": search_query.lower()
-                    })
+    async def _crawl_text_search_tile(self, tile: dict, query: str, label: str = "Tile", bypass_cache: bool = False):
+        """
+        Text-searches a single tile and saves new places. Returns the saved documents and request stats.
+        """
+        location_bias = {
+            "rectangle": {
+                "low": tile.get("low"),
+                "high": tile.get("high")
+            }
+        }
 
-                    await insert_lead(db, business_data)
-                    count += 1
+        print(f"\n📍 {label}: {tile.get('region')} ({tile.get('state')}), Query: '{query}'")
 
-                print(f"✅ {count} saved from {pages_fetched} pages")
+        result_data = await self.maps_service.text_search_places(
+            text_query=query,
+            location_bias=location_bias,
+            max_results=20,
+            bypass_cache=bypass_cache,
+            region_geometry=tile_region_geometry(tile) if PLACES_POLYGON_FILTER_ENABLED else None
+        )
 
-                total_saved += count
-                detailed_results.append({
-                    "region": tile.get("region"),
-                    "state": tile.get("state"),
-                    "saved": count,
-                    "pages": pages_fetched
-                })
+        processed = []
+        for result in result_data.get("results", []):
+            place_id = result.get("place_id") or result.get("id")
+            if not place_id:
+                continue
 
-            except Exception as e:
-                error_msg = f"❌ Error during tile crawl [{tile.get('region')} - {tile.get('state')} - Query: {search_query}]: {str(e)}"
-                print(error_msg)
+            business_data = transform_place_result(result)
+            business_data.update({
+                "state": tile.get("state"),
+                "region": tile.get("region"),
+                "category": "TextSearch",
+                "business_type": query.lower()
+            })
+            if len(tile.get("regions", [])) > 1:
+                # Deduplicated tile standing in for neighbouring regions too
+                business_data["tile_regions"] = tile["regions"]
+            processed.append(business_data)
+
+        # One bulk upsert per tile instead of a find_one + insert_one per place
+        write_result = await bulk_upsert_leads(db, processed)
+
+        return {
+            "saved_data": write_result["inserted_docs"],
+            "matched": write_result["matched"],
+            "modified": write_result["modified"],
+            "pages_fetched": result_data.get("pages_fetched", 0),
+            "requests_made": result_data.get("requests_made", 0),
+            "cached_requests": result_data.get("cached_requests", 0),
+            "saturated": result_data.get("saturated", False)
+        }
+
+    async def crawl_text_search_stream(
+        self,
+        tiles,
+        queries: list,
+        bypass_cache: bool = False,
+        adaptive: bool = False
+    ):
+        """
+        Crawls every query on every tile of a tile stream (e.g. a generator still planning the
+        country). Each tile is searched for all queries as soon as it arrives, so leads land
+        while planning continues; neither the tiles nor per-tile outcomes are accumulated.
+        """
+        totals = {"total_saved": 0, "tiles_scanned": 0}
+        failures = []
+        detailed_results = []
+        api_requests_total = {"billed": 0, "cached": 0}
+        db_writes = {"inserted": 0, "matched": 0, "modified": 0}
+
+        def record(tile, outcome, error):
+            totals["tiles_scanned"] += 1
+            if error:
+                print(f"❌ Error during tile crawl [{tile.get('region')} - {tile.get('state')} - Query: {tile['query']}]: {str(error)}")
                 failures.append({
                     "region": tile.get("region"),
                     "state": tile.get("state"),
-                    "business_type": search_query,
-                    "error": str(e)
+                    "business_type": tile["query"],
+                    "error": str(error)
                 })
+                return
+
+            count = len(outcome["saved_data"])
+            db_writes["inserted"] += count
+            db_writes["matched"] += outcome["matched"]
+            db_writes["modified"] += outcome["modified"]
+            api_requests_total["billed"] += outcome["requests_made"]
+            api_requests_total["cached"] += outcome["cached_requests"]
+            print(f"✅ {count} saved from {outcome['pages_fetched']} pages")
+
+            totals["total_saved"] += count
+            detailed_results.append({
+                "region": tile.get("region"),
+                "state": tile.get("state"),
+                "business_type": tile["query"],
+                "saved": count,
+                "pages": outcome["pages_fetched"]
+            })
+
+        # The query rides along on the tile, so adaptive splits keep it
+        work = ({**tile, "query": query} for tile in tiles for query in queries)
+        await self._crawl_tiles(
+            work, lambda tile: self._crawl_text_search_tile(tile, tile["query"], bypass_cache=bypass_cache),
+            adaptive, on_result=record
+        )
 
         return {
-            "message": "✅ Full crawl completed",
-            "total_saved": total_saved,
-            "tiles_scanned": len(tiles),
+            **totals,
             "failures": failures,
-            "details": detailed_results
+            "details": detailed_results,
+            "api_requests_total": api_requests_total,
+            "db_writes": db_writes
         }
 
-        
     async def crawl_custom_text_search(
         self,
         query: str,
         state: str,
         region: str,
         tiles: list,
-        dry_run: bool = False
+        dry_run: bool = False,
+        bypass_cache: bool = False,
+        adaptive: bool = False
     ):
-        maps_service = GoogleMapsService()
-
         if not tiles:
             return {"error": f"No tiles found for region {region}, state {state}"}
 
@@ -170,77 +400,54 @@ class BusinessManager:
                 "tiles_scanned": len(tiles),
                 "failures": [],
                 "details": dry_run_summary,
-                "api_requests_total": 0  # ✅ explicit for clarity
+                "api_requests_total": {"billed": 0, "cached": 0}  # ✅ explicit for clarity
             }
 
         total_saved = 0
         failures = []
         detailed_results = []
         saved_data = []
-        api_requests_total = 0  # ✅ sum requests across all tiles
-
-        for tile in tiles:
-            location_bias = {
-                "rectangle": {
-                    "low": tile.get("low"),
-                    "high": tile.get("high")
-                }
-            }
-
-            try:
-                print(f"\n📍 Custom Tile: {tile.get('region')} ({tile.get('state')}), Query: '{query}'")
-
-                # (unused var removed) full_text_query = f"{query} in {region}, {state}, Australia"
-
-                result_data = maps_service.text_search_places(
-                    text_query=query,
-                    location_bias=location_bias,
-                    max_results=20
-                )
-
-                results = result_data.get("results", [])
-                pages_fetched = result_data.get("pages_fetched", 0)
-                requests_made = result_data.get("requests_made", 0)  # ✅ from service
-                api_requests_total += requests_made
-
-                count = 0
-                for result in results:
-                    place_id = result.get("place_id") or result.get("id")
-                    if not place_id or await is_duplicate(db, place_id):
-                        continue
-
-                    business_data = transform_place_result(result)
-                    business_data.update({
-                        "state": tile.get("state"),
-                        "region": tile.get("region"),
-                        "category": "TextSearch",
-                        "business_type": query.lower()
-                    })
+        api_requests_total = {"billed": 0, "cached": 0}  # ✅ sum requests across all tiles
+        db_writes = {"inserted": 0, "matched": 0, "modified": 0}
 
-                    await insert_lead(db, business_data)
-                    count += 1
-                    saved_data.append(business_data)
+        crawled = await self._crawl_tiles(
+            tiles, lambda tile: self._crawl_text_search_tile(tile, query, label="Custom Tile", bypass_cache=bypass_cache), adaptive
+        )
 
-                print(f"✅ {count} saved from {pages_fetched} pages ({requests_made} HTTP requests)")
-
-                detailed_results.append({
-                    "region": tile.get("region"),
-                    "state": tile.get("state"),
-                    "saved": count,
-                    "pages": pages_fetched,
-                    "requests": requests_made  # ✅ per-tile visibility
-                })
-                total_saved += count
-
-            except Exception as e:
-                error_msg = f"❌ Error in tile [{tile.get('region')} - {tile.get('state')} - Query: {query}]: {str(e)}"
+        for tile, outcome, error in crawled:
+            if error:
+                error_msg = f"❌ Error in tile [{tile.get('region')} - {tile.get('state')} - Query: {query}]: {str(error)}"
                 print(error_msg)
                 failures.append({
                     "region": tile.get("region"),
                     "state": tile.get("state"),
                     "business_type": query,
-                    "error": str(e)
+                    "error": str(error)
                 })
+                continue
+
+            count = len(outcome["saved_data"])
+            db_writes["inserted"] += count
+            db_writes["matched"] += outcome["matched"]
+            db_writes["modified"] += outcome["modified"]
+            pages_fetched = outcome["pages_fetched"]
+            requests_made = outcome["requests_made"]  # ✅ from service
+            cached_requests = outcome["cached_requests"]
+            api_requests_total["billed"] += requests_made
+            api_requests_total["cached"] += cached_requests
+            saved_data.extend(outcome["saved_data"])
+
+            print(f"✅ {count} saved from {pages_fetched} pages ({requests_made} HTTP requests, {cached_requests} cached)")
+
+            detailed_results.append({
+                "region": tile.get("region"),
+                "state": tile.get("state"),
+                "saved": count,
+                "pages": pages_fetched,
+                "requests": requests_made,  # ✅ per-tile visibility
+                "cached_requests": cached_requests
+            })
+            total_saved += count
 
         cleaned_samples = [
             {"_id": str(doc.get("_id")), **{k: v for k, v in doc.items() if k != "_id"}}
@@ -250,12 +457,13 @@ class BusinessManager:
         return {
             "message": "✅ Custom crawl completed",
             "total_saved": total_saved,
-            "tiles_scanned": len(tiles),
+            "tiles_scanned": len(crawled),
             "failures": failures,
             "details": detailed_results,
             "sample_results": cleaned_samples,
             "saved_data": saved_data,
-            "api_requests_total": api_requests_total  # ✅ aggregate
+            "api_requests_total": api_requests_total,  # ✅ aggregate
+            "db_writes": db_writes
         }
 
 
@@ -1,27 +1,158 @@
-import requests
-import time
+import asyncio
 import json
-from shapely.geometry import box, Point 
-from utils.api_key_manager import APIKeyManager
+import time
+import httpx
+import numpy as np
+import shapely
+from utils.api_key_manager import get_key_manager
+from utils.http_client import get_http_client
 from config.constants import (
     GOOGLE_PLACES_NEARBY_URL,
     GOOGLE_PLACE_DETAILS_URL,
     GOOGLE_PLACES_TEXT_URL,
+    GOOGLE_TEXT_SEARCH_MAX_RESULTS,
     AU_REGIONS,
     REGION_COORDINATES,
     BUSINESS_CATEGORIES
 )
+from config.settings import (
+    PLACES_MAX_INFLIGHT_REQUESTS,
+    PLACES_PAGE_TOKEN_DELAY,
+    PLACES_PAGE_TOKEN_RETRY_INTERVAL,
+    PLACES_PAGE_TOKEN_MAX_RETRIES
+)
 from utils.quota_manager import QuotaManager
+from utils.retry import RetryPolicy, CircuitBreaker, PlacesRequestError, RETRYABLE_STATUS_CODES
+from utils.places_cache import get_places_cache
 
 class GoogleMapsService:
     def __init__(self):
-        self.key_manager = APIKeyManager()
+        self.key_manager = get_key_manager()
         self.quota = QuotaManager()
+        # Only requests on the wire hold a slot; tiles waiting on a page token don't
+        self.request_slots = asyncio.Semaphore(PLACES_MAX_INFLIGHT_REQUESTS)
+        self.retry_policy = RetryPolicy()
+        self.breakers = {name: CircuitBreaker(name) for name in ("nearby", "text", "details")}
+        self.cache = get_places_cache()
+
+    @property
+    def client(self):
+        # Shared keep-alive pool, so every service instance reuses the same connections
+        return get_http_client()
+
+    async def _send(self, endpoint: str, method: str, url: str, headers: dict, **kwargs):
+        """
+        Shared retry layer for every Places call. 429s, 5xx and network timeouts are retried
+        with jittered exponential backoff, bounded in attempts and total time. Each endpoint
+        has its own circuit breaker. Raises PlacesRequestError once the transient failure persists.
+        """
+        breaker = self.breakers[endpoint]
+        started_at = time.monotonic()
+        attempt = 0
+
+        while True:
+            probe = breaker.before_request()
+            try:
+                # Waiting for a key (e.g. all of them cooling down after 429s) spends the same retry budget
+                remaining = self.retry_policy.max_total_time - (time.monotonic() - started_at)
+                response = await self._send_once(method, url, headers, max_wait=max(0.0, remaining), **kwargs)
+            except TimeoutError as e:
+                # The key pool, not the endpoint, ran out of capacity: no breaker verdict
+                raise PlacesRequestError(endpoint, f"Giving up after {attempt + 1} attempts ({e})", 429) from e
+            except httpx.TransportError as e:
+                # Timeouts and connection failures
+                breaker.record_failure()
+                status_code, retry_after, reason = None, None, f"{type(e).__name__}: {e}"
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+
+                status_code = response.status_code
+                reason = f"HTTP {status_code}"
+                retry_after = self._retry_after(response)
+                if status_code == 429:
+                    # The key pool also cools the throttled key down; the retry still honours
+                    # Retry-After itself so it can't outrun the server's request
+                    if probe:
+                        # Throttling is the key pool's concern: the endpoint answered, so it is up
+                        breaker.record_success()
+                else:
+                    breaker.record_failure()
+            finally:
+                if probe and breaker.probing:
+                    # Cancelled mid-flight: no verdict, so let the next request probe instead
+                    breaker.release_probe()
+
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if not self.retry_policy.should_retry(attempt, started_at, delay):
+                raise PlacesRequestError(endpoint, f"Giving up after {attempt + 1} attempts ({reason})", status_code)
+
+            print(f"🔁 {endpoint}: {reason}, retrying in {delay:.1f}s (attempt {attempt + 2}/{self.retry_policy.max_attempts})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send_once(self, method: str, url: str, headers: dict, max_wait: float = None, **kwargs):
+        """
+        Sends one request on the healthiest API key and reports the outcome back to the key pool.
+        Raises TimeoutError if no key frees up within `max_wait` seconds.
+        """
+        key = await self.key_manager.acquire_key(max_wait)
+        headers = {**headers, "X-Goog-Api-Key": key}
+
+        async with self.request_slots:
+            started = self._now()
+            try:
+                response = await self.client.request(method, url, headers=headers, **kwargs)
+            except Exception:
+                self.key_manager.report_error(key, self._now() - started)
+                raise
+            latency = self._now() - started
+
+        if response.status_code == 429:
+            self.key_manager.report_rate_limited(key, self._retry_after(response))
+        elif response.status_code >= 500:
+            self.key_manager.report_error(key, latency)
+        else:
+            self.key_manager.report_success(key, latency)
+        return response
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    async def _wait_for_page_token(self, issued_at: float):
+        """
+        Parks the caller until the page token is expected to be valid.
+        Time already spent processing the previous page counts towards the delay.
+        """
+        remaining = issued_at + PLACES_PAGE_TOKEN_DELAY - self._now()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def _cache_key(self, endpoint: str, headers: dict, payload: dict, page_index: int):
+        if self.cache is None:
+            return None
+        return self.cache.make_key(endpoint, headers.get("X-Goog-FieldMask", ""), payload, page_index)
+
+    @staticmethod
+    def _page_token_pending(response, payload: dict) -> bool:
+        # Google rejects a next-page token with 400 until it becomes valid
+        return response.status_code == 400 and "pageToken" in payload
 
     def _get_headers(self):
         return {
             "Content-Type": "application/json",
-            "X-Goog-Api-Key": self.key_manager.get_key(),
             "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.location,places.types,places.id"
         }
 
@@ -45,49 +176,74 @@ class GoogleMapsService:
         return payload
 
     # Places Nearby Search API
-    def search_places_nearby(self, location: str, place_type: str, radius: float = 5000.0):
+    async def search_places_nearby(self, location: str, place_type: str, radius: float = 5000.0, bypass_cache: bool = False):
         all_results = []
         next_page_token = None
+        token_issued_at = None
+        token_retries = 0
+        pages_fetched = 0
+        chain_cached = self.cache is not None and not bypass_cache
 
         for _ in range(10):  # Max 10 pages per type/location (tune as needed)
             payload = self._get_payload(location, place_type, radius, next_page_token)
             headers = self._get_headers()
+            cache_key = self._cache_key("nearby", headers, payload, pages_fetched)
+
+            data = None
+            if chain_cached:
+                data = await self.cache.aget(cache_key)
+                if data is None and pages_fetched > 0:
+                    # Earlier pages came from cache, so the token we hold is stale: restart live
+                    all_results, next_page_token, pages_fetched, chain_cached = [], None, 0, False
+                    continue
 
-            response = requests.post(GOOGLE_PLACES_NEARBY_URL, json=payload, headers=headers)
-            self.quota.increment()
+            from_cache = data is not None
+            if not from_cache:
+                chain_cached = False
+                if next_page_token:
+                    await self._wait_for_page_token(token_issued_at)
 
-            if response.status_code == 429:
-                print("Rate limit hit. Rotating API key...")
-                self.key_manager.rotate_key()
-                continue
+                response = await self._send("nearby", "POST", GOOGLE_PLACES_NEARBY_URL, json=payload, headers=headers)
+                self.quota.increment()
 
-            if response.status_code != 200:
-                print(f"Google API Error: {response.text}")
-                break
+                if self._page_token_pending(response, payload) and token_retries < PLACES_PAGE_TOKEN_MAX_RETRIES:
+                    token_retries += 1
+                    await asyncio.sleep(PLACES_PAGE_TOKEN_RETRY_INTERVAL)
+                    continue
+
+                if response.status_code != 200:
+                    print(f"Google API Error: {response.text}")
+                    break
+
+                data = response.json()
+                if self.cache is not None:
+                    await self.cache.aput(cache_key, "nearby", data)
 
-            data = response.json()
             places = data.get("places") or data.get("results") or []
             all_results.extend(places)
+            pages_fetched += 1
 
             next_page_token = data.get("nextPageToken")
             if not next_page_token:
                 break
 
-            time.sleep(2)  # Small wait as per Google API best practices
+            # Token becomes valid ~2s after issue; other tiles use the network meanwhile
+            if not from_cache:
+                token_issued_at = self._now()
+                token_retries = 0
 
         return all_results
     
 
     # Places Details API 
-    def get_place_details(self, place_id: str):
+    async def get_place_details(self, place_id: str):
         url = f"{GOOGLE_PLACE_DETAILS_URL}/{place_id}"
         headers = {
             "Content-Type": "application/json",
-            "X-Goog-Api-Key": self.key_manager.get_key(),
             "X-Goog-FieldMask": "id,displayName,formattedAddress,website,formattedPhoneNumber"
         }
 
-        response = requests.get(url, headers=headers)
+        response = await self._send("details", "GET", url, headers=headers)
         self.quota.increment()
 
         if response.status_code != 200:
@@ -97,9 +253,11 @@ class GoogleMapsService:
     
 
     # 🚀 Automated Crawl: Full Country Sweep
-    def crawl_all_regions(self, dry_run: bool = False):
-        results = []
-
+    async def crawl_all_regions(self, dry_run: bool = False):
+        """
+        Async generator yielding one batch per (city, business type) as soon as it's fetched,
+        so callers can persist incrementally instead of holding the whole sweep in memory.
+        """
         for state, cities in AU_REGIONS.items():
             for city in cities:
                 print(f"\n🚩 Scanning {city}, {state}")
@@ -112,44 +270,44 @@ class GoogleMapsService:
                 for category, place_types in BUSINESS_CATEGORIES.items():
                     for place_type in place_types:
                         print(f"🔍 Checking: {place_type} in {city}")
+                        batch = {
+                            "state": state,
+                            "region": city,
+                            "category": category,
+                            "business_type": place_type
+                        }
 
                         if dry_run:
                             # Skip actual search, just simulate entry
-                            results.append({
-                                "place": {
+                            yield {
+                                **batch,
+                                "places": [{
                                     "displayName": {"text": f"{place_type} example in {city}"},
                                     "formattedAddress": f"Example Address, {city}",
                                     "types": [place_type]
-                                },
-                                "state": state,
-                                "region": city,
-                                "category": category,
-                                "business_type": place_type
-                            })
+                                }]
+                            }
                             continue
 
                         try:
-                            places = self.search_places_nearby(location, place_type)
-                            for place in places:
-                                results.append({
-                                    "place": place,
-                                    "state": state,
-                                    "region": city,
-                                    "category": category,
-                                    "business_type": place_type
-                                })
+                            places = await self.search_places_nearby(location, place_type)
                             print(f"Retrieved {len(places)} places.")
                         except Exception as e:
                             print(f"Error while fetching {place_type} in {city}: {str(e)}")
+                            continue
 
-        return results
+                        yield {**batch, "places": places}
 
 
     # Text Search API
-    def text_search_places(self, text_query: str, location_bias: dict = None, max_results: int = 20):
+    async def text_search_places(self, text_query: str, location_bias: dict = None, max_results: int = 20,
+                                 bypass_cache: bool = False, region_geometry=None):
+        """
+        `region_geometry` (EPSG:7844, ideally prepared) additionally drops places that fall inside
+        the tile rectangle but outside the region being crawled.
+        """
         headers = {
             "Content-Type": "application/json",
-            "X-Goog-Api-Key": self.key_manager.get_key(),
             "X-Goog-FieldMask": (
                 "places.id,places.displayName,places.formattedAddress,places.websiteUri,"
                 "places.internationalPhoneNumber,places.types,places.rating,"
@@ -159,8 +317,15 @@ class GoogleMapsService:
 
         all_results = []
         page_token = None
+        token_issued_at = None
+        token_retries = 0
         pages_fetched = 0
         requests_made = 0
+        cached_requests = 0
+        raw_returned = 0
+        hit_page_cap = False
+        # Cache reads stay on only while every earlier page of this chain was a hit
+        chain_cached = self.cache is not None and not bypass_cache
 
         # prepare base payload ONCE
         base_payload = {
@@ -184,47 +349,84 @@ class GoogleMapsService:
                 else:
                     print(f"\n📍 First page search for '{text_query}' WITHOUT location restriction")
 
-            # ---- Perform request (with quota + retry handling) ----
-            response = requests.post(GOOGLE_PLACES_TEXT_URL, json=payload, headers=headers)
-            requests_made += 1
-            self.quota.increment()
+            cache_key = self._cache_key("text", headers, payload, pages_fetched)
+            data = None
+            if chain_cached:
+                data = await self.cache.aget(cache_key)
+                if data is None and pages_fetched > 0:
+                    # Earlier pages came from cache, so the token we hold is stale: restart live
+                    print(f"♻️ Cache chain ends at page {pages_fetched + 1}. Re-fetching this search live.")
+                    cached_requests -= pages_fetched
+                    all_results, page_token, pages_fetched, chain_cached = [], None, 0, False
+                    raw_returned = 0
+                    continue
+
+            from_cache = data is not None
+            if from_cache:
+                cached_requests += 1
+                print(f"💾 Page {pages_fetched + 1} served from cache")
+            else:
+                chain_cached = False
+                if page_token:
+                    await self._wait_for_page_token(token_issued_at)
+
+                # ---- Perform request (with quota + retry handling) ----
+                response = await self._send("text", "POST", GOOGLE_PLACES_TEXT_URL, json=payload, headers=headers)
+                requests_made += 1
+                self.quota.increment()
+
+                if self._page_token_pending(response, payload) and token_retries < PLACES_PAGE_TOKEN_MAX_RETRIES:
+                    token_retries += 1
+                    print("⏳ Page token not valid yet. Retrying shortly...")
+                    await asyncio.sleep(PLACES_PAGE_TOKEN_RETRY_INTERVAL)
+                    continue
 
-            if response.status_code == 429:
-                print("🚫 Rate limit hit. Rotating API key...")
-                self.key_manager.rotate_key()
-                time.sleep(1.5)
-                # retry next loop iteration using the new key
-                continue
+                if response.status_code != 200:
+                    print(f"❌ Google API Error: {response.status_code} | {response.text}")
+                    break
 
-            if response.status_code != 200:
-                print(f"❌ Google API Error: {response.status_code} | {response.text}")
-                break
+                data = response.json()
+                if self.cache is not None:
+                    await self.cache.aput(cache_key, "text", data)
 
-            data = response.json()
             results = data.get("places", [])
+            raw_returned += len(results)
             print(f"📊 Page {pages_fetched + 1} results: {len(results)} places found")
 
             if not results:
                 print("⛔ Empty page returned. Stopping further requests to save quota.")
                 break
 
-            # Geo-filter strictly inside the tile rectangle
+            # Geo-filter strictly inside the tile rectangle, then inside the region polygon
+            in_bounds = len(results)
             if location_bias and "rectangle" in location_bias:
                 low = location_bias["rectangle"]["low"]
                 high = location_bias["rectangle"]["high"]
-                bounds_polygon = box(low["longitude"], low["latitude"], high["longitude"], high["latitude"])
 
-                filtered_results = []
+                located = []
                 for place in results:
                     loc = place.get("location", {})
                     if not loc or "longitude" not in loc or "latitude" not in loc:
                         print("⚠️ Skipping place: Missing or malformed location")
                         continue
-                    point = Point(loc["longitude"], loc["latitude"])
-                    if bounds_polygon.contains(point):
-                        filtered_results.append(place)
-
-                print(f"🌐 Geo-filtered: {len(filtered_results)} / {len(results)} retained inside bounds")
+                    located.append(place)
+
+                # Cheap numeric bounds test for the whole page first
+                lons = np.array([place["location"]["longitude"] for place in located], dtype=float)
+                lats = np.array([place["location"]["latitude"] for place in located], dtype=float)
+                keep = (
+                    (lons > low["longitude"]) & (lons < high["longitude"]) &
+                    (lats > low["latitude"]) & (lats < high["latitude"])
+                )
+                in_bounds = int(keep.sum())
+
+                # Only points inside the rectangle pay for the (prepared) polygon test
+                if region_geometry is not None and in_bounds:
+                    keep[keep] = shapely.contains_xy(region_geometry, lons[keep], lats[keep])
+
+                filtered_results = [place for place, kept in zip(located, keep) if kept]
+                print(f"🌐 Geo-filtered: {len(filtered_results)} / {len(results)} retained inside bounds"
+                      + (f" ({in_bounds} in tile, {len(filtered_results)} in region)" if region_geometry is not None else ""))
                 results = filtered_results
             else:
                 print("⚠️ No location restriction provided. Skipping geo-filtering.")
@@ -233,7 +435,8 @@ class GoogleMapsService:
             # After geo-filtering
             print(f"✅ Page {pages_fetched + 1} fetched: {len(results)} filtered results")
 
-            if not results:
+            # Stop on an empty tile, not an empty region: later pages can still land inside the polygon
+            if not in_bounds:
                 print("⛔ No results after geo-filtering. Stopping further requests.")
                 break
 
@@ -249,18 +452,28 @@ class GoogleMapsService:
                 break
 
             page_token = token
-            time.sleep(2.0)
+            if not from_cache:
+                token_issued_at = self._now()
+                token_retries = 0
+        else:
+            hit_page_cap = True
 
         # De-dup by 'id' (as requested in field mask)
         unique_results = {place["id"]: place for place in all_results if "id" in place}
 
         print(f"\n🎯 Done: {len(unique_results)} total unique places across {pages_fetched} pages "
-              f"({requests_made} HTTP requests).")
+              f"({requests_made} HTTP requests, {cached_requests} from cache).")
+
+        # Google stops paging at its result cap, so a search that reached it may have
+        # more places than it returned; adaptive crawls split such tiles further
+        saturated = hit_page_cap or raw_returned >= GOOGLE_TEXT_SEARCH_MAX_RESULTS
 
         return {
             "results": list(unique_results.values()),
             "pages_fetched": pages_fetched,
             "total_returned": len(unique_results),
-            "requests_made": requests_made
+            "requests_made": requests_made,
+            "cached_requests": cached_requests,
+            "saturated": saturated
         }
     
@@ -0,0 +1,59 @@
+import json
+import os
+import pytest
+import shapely
+from shapely.geometry import mapping
+
+os.environ.setdefault("GOOGLE_API_KEYS", "test-key")
+
+from routes.business import full_crawl_tiles
+from utils import geo_index, helpers
+from utils.tile_dedup import TileDeduplicator
+
+STATES = ["New South Wales", "Victoria"]
+
+
+def write_lga_geojson(path):
+    # A 4 x 3 grid of ~30 km squares overlapping their neighbours by ~10 km; without an area they
+    # are tiled at 5 km, so tiles in the overlaps are covered twice and dedup has work to do
+    features = []
+    for i in range(12):
+        lon, lat = 145 + (i % 4) * 0.19, -37 + (i // 4) * 0.19
+        features.append({
+            "type": "Feature",
+            "properties": {"LGA_NAME24": f"Town {i}", "STE_NAME21": STATES[i % 2], "AREASQKM": 0},
+            "geometry": mapping(shapely.box(lon, lat, lon + 0.29, lat + 0.29))
+        })
+    path.parent.mkdir(parents=True)
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+@pytest.fixture
+def lga_index(tmp_path, monkeypatch):
+    write_lga_geojson(tmp_path / "data" / "geojson" / "lga.geojson")
+    # Worker processes are spawned, so they read boundaries and settings from the cwd and environment
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TILE_PLAN_CACHE_ENABLED", "false")
+    monkeypatch.setenv("GEOSTORE_ENABLED", "false")
+    monkeypatch.setattr(helpers, "get_tile_plan_cache", lambda: None)
+    monkeypatch.setattr(geo_index, "GEOSTORE_ENABLED", False)
+    monkeypatch.setattr(helpers, "TILE_PLAN_CHUNK_SIZE", 4)
+    geo_index._indexes.pop("lga", None)
+    yield geo_index.get_geometry_index("lga")
+    geo_index._indexes.pop("lga", None)
+
+
+@pytest.mark.parametrize("dedupe", [False, True])
+def test_pooled_planning_streams_the_same_tiles_as_serial(lga_index, dedupe):
+    def stream(workers):
+        deduplicator = TileDeduplicator() if dedupe else None
+        return list(full_crawl_tiles(lga_index, deduplicator=deduplicator, workers=workers)), deduplicator
+
+    serial, serial_dedup = stream(workers=1)
+    pooled, pooled_dedup = stream(workers=3)
+
+    assert serial
+    assert pooled == serial
+    if dedupe:
+        assert pooled_dedup.stats() == serial_dedup.stats()
+        assert serial_dedup.dropped > 0
@@ -0,0 +1,92 @@
+import shapely
+from utils import geo_index
+from utils.geo_index import GeometryIndex, tile_region_geometry
+from utils.tile_dedup import TileDeduplicator
+
+SOURCE = "dedup_test"
+
+# Two neighbouring regions: A spans longitudes 0-1, B spans 1-2
+REGION_GEOMS = {"a": shapely.box(0, 0, 1, 1), "b": shapely.box(1, 0, 2, 1), "c": shapely.box(2, 0, 3, 1)}
+
+
+def make_tile(region, lon_min, lon_max, name):
+    return {
+        "region": region, "state": "Test", "source": SOURCE, "tile_name": name,
+        "low": {"latitude": 0.0, "longitude": lon_min}, "high": {"latitude": 1.0, "longitude": lon_max}
+    }
+
+
+def setup_module():
+    index = GeometryIndex(SOURCE)
+    index.geoms = dict(REGION_GEOMS)
+    geo_index._indexes[SOURCE] = index
+
+
+def teardown_module():
+    geo_index._indexes.pop(SOURCE, None)
+    geo_index._region_geometry.cache_clear()
+
+
+def crawl_as_released(region_plans, region_bounds):
+    """
+    Consumes deduplicate() the way the crawler does: each tile's region polygons are resolved
+    the moment it is yielded, before any later region is planned.
+    """
+    return [
+        (tile["tile_name"], [entry["region"] for entry in tile["regions"]], tile_region_geometry(tile))
+        for tile in TileDeduplicator(coverage=0.9, bucket_deg=0.5, hold_margin_deg=0.1).deduplicate(
+            region_plans, region_bounds
+        )
+    ]
+
+
+def test_tile_dropped_after_kept_tile_planned_is_searched_for_its_region():
+    # A's tile spills over the border into B; B's border tile lies inside it and is dropped
+    plans = [
+        [make_tile("a", 0.0, 1.05, "a_0")],
+        [make_tile("b", 1.0, 1.05, "b_0"), make_tile("b", 1.05, 2.0, "b_1")],
+    ]
+    crawled = crawl_as_released(plans, [REGION_GEOMS["a"].bounds, REGION_GEOMS["b"].bounds])
+
+    assert [name for name, _, _ in crawled] == ["a_0", "b_1"]
+    _, regions, geometry = crawled[0]
+    assert regions == ["a", "b"]
+    # A place in B's strip of A's tile survives the polygon filter
+    assert shapely.contains_xy(geometry, 1.02, 0.5)
+
+
+def test_dropped_tile_is_attributed_to_every_kept_tile_covering_it():
+    # B's border tile is split between two of A's tiles; both must search it for B
+    plans = [
+        [make_tile("a", 0.0, 1.02, "a_0"), make_tile("a", 1.02, 1.04, "a_1")],
+        [make_tile("b", 1.0, 1.04, "b_0")],
+    ]
+    crawled = crawl_as_released(plans, [REGION_GEOMS["a"].bounds, REGION_GEOMS["b"].bounds])
+
+    assert {name: regions for name, regions, _ in crawled} == {"a_0": ["a", "b"], "a_1": ["a", "b"]}
+    assert all(shapely.contains_xy(geometry, 1.03, 0.5) for _, _, geometry in crawled)
+
+
+def test_tile_covered_only_by_released_tiles_is_kept():
+    # C's extent is unknown, so A's tile is released before C is planned and can't absorb C's tile
+    plans = [
+        [make_tile("a", 0.0, 1.05, "a_0")],
+        [make_tile("c", 0.9, 1.05, "c_0")],
+    ]
+    crawled = crawl_as_released(plans, [REGION_GEOMS["a"].bounds, None])
+
+    assert [(name, regions) for name, regions, _ in crawled] == [("a_0", ["a"]), ("c_0", ["c"])]
+
+
+def test_kept_tile_waits_for_overlapping_regions_only():
+    dedup = TileDeduplicator(coverage=0.9, bucket_deg=0.5, hold_margin_deg=0.1)
+    dedup.expect_region(1, REGION_GEOMS["b"].bounds)
+    dedup.expect_region(2, (10.0, 10.0, 11.0, 11.0))
+
+    assert dedup.add(make_tile("a", 0.0, 0.5, "far_from_b"), 0)
+    assert dedup.add(make_tile("a", 0.5, 1.05, "near_b"), 0)
+    dedup.finish_region(0)
+    assert [tile["tile_name"] for tile in dedup.release()] == ["far_from_b"]
+
+    dedup.finish_region(1)
+    assert [tile["tile_name"] for tile in dedup.release()] == ["near_b"]
@@ -1,20 +1,179 @@
-import itertools
+import asyncio
 import os
 import random
+import time
+from config.settings import (
+    GOOGLE_KEY_QPS,
+    GOOGLE_KEY_BURST,
+    GOOGLE_KEY_COOLDOWN_BASE,
+    GOOGLE_KEY_COOLDOWN_MAX
+)
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens/second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def try_consume(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class KeyState:
+    """Rate budget and health counters for a single API key."""
+
+    def __init__(self, key: str, qps: float, burst: float):
+        self.key = key
+        self.bucket = TokenBucket(qps, burst)
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.avg_latency = None  # exponentially weighted, seconds
+        self.cooldown_until = 0.0
+
+    def in_cooldown(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def record_latency(self, latency: float):
+        self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+
+    def start_cooldown(self, seconds: float):
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+    def summary(self) -> dict:
+        return {
+            "key": f"...{self.key[-4:]}",
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.avg_latency * 1000, 1) if self.avg_latency is not None else None,
+            "available_tokens": round(self.bucket.available(), 2),
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - time.monotonic()), 1)
+        }
+
 
 class APIKeyManager:
-    def __init__(self):
+    def __init__(self, qps: float = GOOGLE_KEY_QPS, burst: float = GOOGLE_KEY_BURST):
         # Load keys from environment or fallback config
         keys_env = os.getenv("GOOGLE_API_KEYS", "")
         self.api_keys = [key.strip() for key in keys_env.split(",") if key.strip()]
-        
+
         if not self.api_keys:
             raise Exception("No API keys found in environment variable: GOOGLE_API_KEYS")
 
         # Shuffle keys to randomize initial key access for better distribution
         random.shuffle(self.api_keys)
 
-        self.keys_cycle = itertools.cycle(self.api_keys)  # round robin
+        self.states = {key: KeyState(key, qps, burst) for key in self.api_keys}
+
+    def _best_key(self):
+        """
+        Healthy key with the most spare capacity (ties go to the faster key), or None if all are cooling down.
+        """
+        healthy = [state for state in self.states.values() if not state.in_cooldown()]
+        if not healthy:
+            return None
+        return max(
+            healthy,
+            key=lambda s: (s.bucket.available(), -(s.avg_latency or 0.0))
+        )
 
     def get_key(self) -> str:
-        return next(self.keys_cycle)
+        """
+        Non-blocking pick for callers that don't pace themselves.
+        Consumes a token when one is available but never waits.
+        """
+        state = self._best_key() or min(self.states.values(), key=lambda s: s.cooldown_until)
+        state.bucket.try_consume()
+        state.requests += 1
+        return state.key
+
+    async def acquire_key(self, max_wait: float = None) -> str:
+        """
+        Waits until some healthy key has QPS budget, then consumes one token from it.
+        Raises TimeoutError instead of waiting past `max_wait` seconds.
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            state = self._best_key()
+            if state is None:
+                # Every key is cooling down; sleep until the first one recovers
+                wake_at = min(s.cooldown_until for s in self.states.values())
+                wait = max(0.05, wake_at - time.monotonic())
+            elif state.bucket.try_consume():
+                state.requests += 1
+                return state.key
+            else:
+                wait = state.bucket.wait_time()
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TimeoutError(f"no API key available within {max_wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    def report_success(self, key: str, latency: float):
+        state = self.states[key]
+        state.record_latency(latency)
+        state.consecutive_failures = 0
+
+    def report_rate_limited(self, key: str, retry_after: float = None):
+        """
+        Puts a key that returned 429 into cooldown. Repeated 429s back off exponentially.
+        """
+        state = self.states[key]
+        state.rate_limited += 1
+        state.consecutive_failures += 1
+        backoff = GOOGLE_KEY_COOLDOWN_BASE * 2 ** (state.consecutive_failures - 1)
+        cooldown = min(GOOGLE_KEY_COOLDOWN_MAX, max(backoff, retry_after or 0))
+        state.start_cooldown(cooldown)
+        print(f"🧊 Key ...{key[-4:]} cooling down for {cooldown:.1f}s")
+
+    def report_error(self, key: str, latency: float = None):
+        state = self.states[key]
+        state.errors += 1
+        if latency is not None:
+            state.record_latency(latency)
+
+    def rotate_key(self, key: str = None):
+        """
+        Backwards-compatible hook: cools down the given key (or the busiest one) so the next pick moves on.
+        """
+        key = key or max(self.states.values(), key=lambda s: s.requests).key
+        self.report_rate_limited(key)
+
+    def stats(self) -> list:
+        return [state.summary() for state in self.states.values()]
+
+
+_shared_manager = None
+
+
+def get_key_manager() -> APIKeyManager:
+    """
+    Process-wide key pool, so rate budgets and cooldowns are shared by every GoogleMapsService.
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = APIKeyManager()
+    return _shared_manager
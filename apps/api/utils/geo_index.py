@@ -0,0 +1,158 @@
+import hashlib
+import json
+import threading
+from functools import lru_cache
+import pyproj
+import shapely
+from shapely.geometry import shape
+from shapely.ops import transform
+from config.constants import GCCSA_PATH, LGA_PATH, REGIONS_PATH
+from config.settings import GEOSTORE_ENABLED, REGION_GEOMETRY_CACHE_SIZE
+from utils.geo_store import GeoStore, geostore_is_current, geostore_path
+
+# Boundary sources: file plus the property keys holding each feature's name and area
+GEOJSON_SOURCES = {
+    "gccsa": {"path": GCCSA_PATH, "name_key": "GCC_NAME21", "area_key": "AREASQKM21"},
+    "lga": {"path": LGA_PATH, "name_key": "LGA_NAME24", "area_key": "AREASQKM"},
+    "regions": {"path": REGIONS_PATH, "name_key": "SA2_NAME21", "area_key": "AREASQKM21"},
+}
+
+
+@lru_cache(maxsize=None)
+def get_transformers():
+    """
+    Cached (project, reverse_project) functions between GDA2020 (EPSG:7844) and Web Mercator (EPSG:3857).
+    """
+    project = pyproj.Transformer.from_crs("EPSG:7844", "EPSG:3857", always_xy=True).transform
+    reverse_project = pyproj.Transformer.from_crs("EPSG:3857", "EPSG:7844", always_xy=True).transform
+    return project, reverse_project
+
+
+class GeometryIndex:
+    """
+    Validated shapely geometries, area and properties for one boundary source,
+    keyed by lower-cased region name. Projected (EPSG:3857) geometries are built on first use.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.geoms = {}
+        self.areas = {}
+        self.metadata = {}
+        self.features = []  # properties of every feature, in file order
+        self.fingerprint = None  # sha256 of the source GeoJSON, for caches keyed on boundary content
+        self._projected = {}
+
+    @classmethod
+    def from_geojson(cls, source: str, path: str):
+        config = GEOJSON_SOURCES[source]
+        with open(path, "rb") as f:
+            raw = f.read()
+        region_data = json.loads(raw)
+
+        index = cls(source)
+        index.fingerprint = hashlib.sha256(raw).hexdigest()
+        for feature in region_data["features"]:
+            properties = feature["properties"]
+            index.features.append(properties)
+
+            geom = feature.get("geometry")
+            if not geom:
+                continue
+
+            name = properties.get(config["name_key"], "").strip().lower()
+            shapely_geom = shape(geom)
+            if not shapely_geom.is_valid:
+                shapely_geom = shapely_geom.buffer(0)  # fix self-intersections if needed
+
+            index.geoms[name] = shapely_geom
+            index.areas[name] = properties.get(config["area_key"], 0) or 0
+            index.metadata[name] = properties
+        return index
+
+    @classmethod
+    def from_store(cls, source: str, path: str):
+        """
+        Index backed by a compiled geometry store (see utils/geo_store.py). Geometries,
+        including the pre-projected EPSG:3857 ones, are decoded from memory-mapped WKB on access.
+        """
+        store = GeoStore(path)
+        index = cls(source)
+        index.geoms = store.geoms()
+        index.areas = store.areas
+        index.fingerprint = store.fingerprint
+        index.metadata = store.metadata()
+        index.features = store.features()
+        index._projected = store.projected()
+        return index
+
+    def get(self, name: str):
+        return self.geoms.get(name.strip().lower())
+
+    def projected(self, name: str):
+        """EPSG:3857 geometry for a region, projected once and cached."""
+        name = name.strip().lower()
+        if name not in self._projected:
+            project, _ = get_transformers()
+            self._projected[name] = transform(project, self.geoms[name])
+        return self._projected[name]
+
+
+def _load_index(source: str) -> GeometryIndex:
+    geojson_path = GEOJSON_SOURCES[source]["path"]
+    if GEOSTORE_ENABLED and geostore_is_current(source, geojson_path):
+        print(f"\n📂 Loading geometry store: {source} ...")
+        return GeometryIndex.from_store(source, geostore_path(source))
+
+    print(f"\n📂 Loading GeoJSON data: {source} ...")
+    return GeometryIndex.from_geojson(source, geojson_path)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_geometry_index(source: str) -> GeometryIndex:
+    """
+    Process-wide geometry index for a boundary source ('gccsa', 'lga' or 'regions'),
+    loaded on first use and reused by every later call. A current compiled store is
+    preferred over parsing the GeoJSON.
+    """
+    source = source.lower()
+    if source not in _indexes:
+        with _indexes_lock:
+            if source not in _indexes:
+                _indexes[source] = _load_index(source)
+    return _indexes[source]
+
+
+@lru_cache(maxsize=REGION_GEOMETRY_CACHE_SIZE)
+def _region_geometry(source: str, region_names: tuple):
+    # Only reached once the index has loaded, so a failed load is never memoized
+    geo_index = get_geometry_index(source)
+    geoms = [geom for geom in (geo_index.get(name) for name in region_names) if geom is not None]
+    if not geoms:
+        return None
+    geom = shapely.union_all(geoms) if len(geoms) > 1 else geoms[0]
+    shapely.prepare(geom)
+    return geom
+
+
+def tile_region_geometry(tile: dict):
+    """
+    Prepared (EPSG:7844) union of the region polygons a planned tile stands for: its own region
+    plus any merged into it by tile dedup. None for ad-hoc tiles without a boundary source.
+    """
+    source = tile.get("source")
+    names = {entry.get("region") for entry in tile.get("regions", [])}
+    names.add(tile.get("region"))
+    names.discard(None)
+    if not source or not names:
+        return None
+    try:
+        # Loaded (and cached) by get_geometry_index itself; a failure is retried on the next tile
+        get_geometry_index(source)
+    except Exception as e:
+        print(f"⚠️ Region polygons for '{source}' unavailable, filtering by tile bounds only: {e}")
+        return None
+    return _region_geometry(source, tuple(sorted(names)))
@@ -0,0 +1,200 @@
+import json
+import mmap
+import os
+import shutil
+import sys
+from collections.abc import Mapping, Sequence
+import numpy as np
+import shapely
+from config.settings import GEOSTORE_DIR
+
+# Bump when the on-disk layout changes; older stores are ignored and must be rebuilt
+GEOSTORE_VERSION = 2
+
+# Files making up one source's store (data/geostore/<source>/)
+INDEX_FILE = "index.json"
+GEOMS_FILE = "geoms_7844.wkb"
+PROJECTED_FILE = "geoms_3857.wkb"
+GEOM_OFFSETS_FILE = "geom_offsets.npy"
+PROPERTIES_FILE = "properties.jsonl"
+PROPERTY_OFFSETS_FILE = "property_offsets.npy"
+
+
+def _file_signature(path: str):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def _map_file(path: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _LazyRows(Mapping):
+    """Read-only name -> value mapping decoded from the store on every access."""
+
+    def __init__(self, rows: dict, decode):
+        self._rows = rows
+        self._decode = decode
+
+    def __getitem__(self, name):
+        return self._decode(self._rows[name])
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class _PropertyTable(Sequence):
+    """Per-feature property dicts, in source file order, decoded from the memory-mapped table."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._store.properties(range(len(self))[i])
+
+    def __len__(self):
+        return len(self._store.property_offsets) - 1
+
+
+class GeoStore:
+    """
+    Read side of a compiled geometry store.
+
+    WKB blobs and property records are memory-mapped read-only, so every API and worker
+    process shares the same page-cache copy and only decodes the rows it touches.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+
+        self.names = self.index["names"]
+        self.areas = dict(zip(self.names, self.index["areas"]))
+        self.rows = {name: i for i, name in enumerate(self.names)}
+        self.feature_rows = self.index["feature_rows"]
+        self.fingerprint = self.index["source_sha256"]
+
+        self.geom_offsets = np.load(os.path.join(path, GEOM_OFFSETS_FILE), mmap_mode="r")
+        self.property_offsets = np.load(os.path.join(path, PROPERTY_OFFSETS_FILE), mmap_mode="r")
+        self._geoms = _map_file(os.path.join(path, GEOMS_FILE))
+        self._projected = _map_file(os.path.join(path, PROJECTED_FILE))
+        self._properties = _map_file(os.path.join(path, PROPERTIES_FILE))
+
+    def geometry(self, row: int, projected: bool = False):
+        column = 1 if projected else 0
+        start, end = int(self.geom_offsets[row, column]), int(self.geom_offsets[row + 1, column])
+        blob = self._projected if projected else self._geoms
+        return shapely.from_wkb(blob[start:end])
+
+    def properties(self, feature_row: int) -> dict:
+        start, end = int(self.property_offsets[feature_row]), int(self.property_offsets[feature_row + 1])
+        return json.loads(self._properties[start:end])
+
+    def geoms(self) -> Mapping:
+        return _LazyRows(self.rows, self.geometry)
+
+    def projected(self) -> Mapping:
+        return _LazyRows(self.rows, lambda row: self.geometry(row, projected=True))
+
+    def metadata(self) -> Mapping:
+        return _LazyRows(self.rows, lambda row: self.properties(self.feature_rows[row]))
+
+    def features(self) -> Sequence:
+        return _PropertyTable(self)
+
+
+def geostore_path(source: str) -> str:
+    return os.path.join(GEOSTORE_DIR, source)
+
+
+def geostore_is_current(source: str, geojson_path: str) -> bool:
+    """
+    True when a store for `source` exists, matches GEOSTORE_VERSION and was built from the
+    GeoJSON currently on disk. A store shipped without its GeoJSON is always used.
+    """
+    index_path = os.path.join(geostore_path(source), INDEX_FILE)
+    if not os.path.exists(index_path):
+        return False
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != GEOSTORE_VERSION:
+        print(f"⚠️ Geometry store for '{source}' is from an older format, rebuild it with: python -m utils.geo_store")
+        return False
+    if os.path.exists(geojson_path) and index.get("source_file") != _file_signature(geojson_path):
+        print(f"⚠️ Geometry store for '{source}' is older than {geojson_path}, rebuild it with: python -m utils.geo_store")
+        return False
+    return True
+
+
+def build_geostore(geo_index, geojson_path: str, out_dir: str = None) -> str:
+    """
+    Writes a parsed GeometryIndex (validated EPSG:7844 geometries) to a binary store,
+    together with its EPSG:3857 projection and the property table.
+    """
+    out_dir = out_dir or geostore_path(geo_index.source)
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    names = list(geo_index.geoms)
+    geom_offsets = np.zeros((len(names) + 1, 2), dtype=np.int64)
+    with open(os.path.join(tmp_dir, GEOMS_FILE), "wb") as geoms_f, \
+            open(os.path.join(tmp_dir, PROJECTED_FILE), "wb") as projected_f:
+        for i, name in enumerate(names):
+            geom_offsets[i + 1, 0] = geom_offsets[i, 0] + geoms_f.write(shapely.to_wkb(geo_index.geoms[name]))
+            geom_offsets[i + 1, 1] = geom_offsets[i, 1] + projected_f.write(shapely.to_wkb(geo_index.projected(name)))
+    np.save(os.path.join(tmp_dir, GEOM_OFFSETS_FILE), geom_offsets)
+
+    property_offsets = np.zeros(len(geo_index.features) + 1, dtype=np.int64)
+    with open(os.path.join(tmp_dir, PROPERTIES_FILE), "wb") as properties_f:
+        for i, properties in enumerate(geo_index.features):
+            record = json.dumps(properties, separators=(",", ":")).encode("utf-8") + b"\n"
+            property_offsets[i + 1] = property_offsets[i] + properties_f.write(record)
+    np.save(os.path.join(tmp_dir, PROPERTY_OFFSETS_FILE), property_offsets)
+
+    # Metadata dicts are the feature's own properties object, so identity finds its row
+    feature_row_by_id = {id(properties): i for i, properties in enumerate(geo_index.features)}
+    index = {
+        "version": GEOSTORE_VERSION,
+        "source": geo_index.source,
+        "source_file": _file_signature(geojson_path),
+        "source_sha256": geo_index.fingerprint,
+        "names": names,
+        "areas": [geo_index.areas[name] for name in names],
+        "feature_rows": [feature_row_by_id[id(geo_index.metadata[name])] for name in names]
+    }
+    with open(os.path.join(tmp_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return out_dir
+
+
+def main(sources=None):
+    from utils.geo_index import GEOJSON_SOURCES, GeometryIndex
+
+    for source in sources or GEOJSON_SOURCES:
+        geojson_path = GEOJSON_SOURCES[source]["path"]
+        if not os.path.exists(geojson_path):
+            print(f"❌ File not found: {geojson_path}")
+            continue
+        print(f"📦 Compiling geometry store: {source} ...")
+        out_dir = build_geostore(GeometryIndex.from_geojson(source, geojson_path), geojson_path)
+        print(f"✅ Saved: {out_dir}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -3,14 +3,20 @@ import os
 import re
 import requests
 import math
-import json
-import difflib
-from shapely.geometry import shape, box, Polygon
+import numpy as np
+import shapely
+from shapely.geometry import box, Polygon
 from shapely.ops import transform
-import pyproj
 from tqdm import tqdm
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from utils.geo_index import get_geometry_index, get_transformers
+from utils.tile_plan_cache import get_tile_plan_cache
+from utils.region_search import SOURCE_REGION_TYPES, get_region_search_index
 from config.constants import REGION_COORDINATES, AU_REGIONS
 from config.constants import GCCSA_REGIONS, TILE_SIZE_OVERRIDES, LOW_DENSITY_REGION_KEYWORDS
+from config.settings import TILE_PLAN_WORKERS, TILE_PLAN_CHUNK_SIZE
 
 
 def transform_place_result(result: dict) -> dict:
@@ -38,237 +44,355 @@ def km_to_lat_lon_deltas(km: float):
     return km / 111, km / 111  # ~111 km per degree latitude/longitude
 
 
-# Tile Generation for all regions using GeoJSON files
-def generate_tiles_for_australia(
-    tile_km: float = 10.0,
-    geojson_source: str = "lga",
-    target_region: str = None,
-    state_name: str = None
-):
-    print(f"\n📂 Loading GeoJSON data: {geojson_source} ...")
-    base_path = "data/geojson"
-    geojson_filename_map = {
-        "gccsa": "gccsa.geojson",
-        "lga": "lga.geojson",
-        "regions": "regions.geojson"
-    }
+def tile_height_km(tile: dict) -> float:
+    return (tile["high"]["latitude"] - tile["low"]["latitude"]) * 111
 
-    geojson_path = os.path.join(base_path, geojson_filename_map.get(geojson_source.lower(), "regions.geojson"))
-    with open(geojson_path, 'r', encoding='utf-8') as f:
-        region_data = json.load(f)
 
-    region_geom_map, region_area_map, region_metadata_map = {}, {}, {}
+def split_tile(tile: dict) -> list:
+    """
+    Splits a tile rectangle into four quadrant tiles (quadtree step), keeping its region metadata.
+    """
+    low, high = tile["low"], tile["high"]
+    mid_lat = round((low["latitude"] + high["latitude"]) / 2, 6)
+    mid_lon = round((low["longitude"] + high["longitude"]) / 2, 6)
+    lat_edges = [(low["latitude"], mid_lat), (mid_lat, high["latitude"])]
+    lon_edges = [(low["longitude"], mid_lon), (mid_lon, high["longitude"])]
+
+    children = []
+    for i, (lat_min, lat_max) in enumerate(lat_edges):
+        for j, (lon_min, lon_max) in enumerate(lon_edges):
+            children.append({
+                **tile,
+                "tile_name": f"{tile.get('tile_name', 'tile')}_q{i * 2 + j}",
+                "depth": tile.get("depth", 0) + 1,
+                "low": {"latitude": lat_min, "longitude": lon_min},
+                "high": {"latitude": lat_max, "longitude": lon_max}
+            })
+    return children
 
-    region_name_key = {
-        "gccsa": "GCC_NAME21",
-        "lga": "LGA_NAME24",
-        "regions": "SA2_NAME21"
-    }[geojson_source]
 
-    region_area_key = {
-        "gccsa": "AREASQKM21",
-        "lga": "AREASQKM",
-        "regions": "AREASQKM21"
-    }[geojson_source]
+def grid_origins(start: float, stop: float, step: float):
+    """
+    Cell origins along one grid axis. Accumulated step by step (not via arange) so the
+    floats match the original nested-loop tiler exactly.
+    """
+    origins = []
+    value = start
+    while value < stop:
+        origins.append(value)
+        value += step
+    return np.array(origins)
 
-    print("🔎 Building geometry maps...")
-    for feature in region_data["features"]:
-        name = feature["properties"].get(region_name_key, "").strip().lower()
-        geom = feature.get("geometry")
-        if not geom:
-            continue
 
-        shapely_geom = shape(geom)
-        if not shapely_geom.is_valid:
-            shapely_geom = shapely_geom.buffer(0)  # fix self-intersections if needed
+def determine_tile_size(region_name, metadata, geojson_source):
+    name = region_name.lower()
+    area_key = "AREASQKM21" if geojson_source != "lga" else "AREASQKM"
+    area = metadata.get(area_key, 0) or 0
+    gcc_name = (metadata.get("GCC_NAME21") or "").lower()
+    sa4_name = (metadata.get("SA4_NAME21") or "").lower()
 
-        region_geom_map[name] = shapely_geom
-        region_area_map[name] = feature["properties"].get(region_area_key, 0) or 0
-        region_metadata_map[name] = feature["properties"]
+    # 1. Keyword-based overrides (low density)
+    if any(keyword in name or keyword in sa4_name for keyword in LOW_DENSITY_REGION_KEYWORDS):
+        return max(size for _, _, size in TILE_SIZE_OVERRIDES)
 
-    print("🌐 Setting up coordinate transformations...")
-    project = pyproj.Transformer.from_crs("EPSG:7844", "EPSG:3857", always_xy=True).transform
-    reverse_project = pyproj.Transformer.from_crs("EPSG:3857", "EPSG:7844", always_xy=True).transform
+    # 2. Metro regions (use finer tiles)
+    if gcc_name in [g.lower() for g in GCCSA_REGIONS]:
+        if area and area < 5000:
+            return 5
+        return 10
 
-    all_tiles = []
+    # 3. Area-based overrides
+    for min_area, max_area, size in TILE_SIZE_OVERRIDES:
+        if min_area <= area < max_area:
+            return size
 
-    def determine_tile_size(region_name, metadata, geojson_source):
-        name = region_name.lower()
-        area_key = "AREASQKM21" if geojson_source != "lga" else "AREASQKM"
-        area = metadata.get(area_key, 0) or 0
-        gcc_name = (metadata.get("GCC_NAME21") or "").lower()
-        sa4_name = (metadata.get("SA4_NAME21") or "").lower()
-
-        # 1. Keyword-based overrides (low density)
-        if any(keyword in name or keyword in sa4_name for keyword in LOW_DENSITY_REGION_KEYWORDS):
-            return max(size for _, _, size in TILE_SIZE_OVERRIDES)
-
-        # 2. Metro regions (use finer tiles)
-        if gcc_name in [g.lower() for g in GCCSA_REGIONS]:
-            if area and area < 5000:
-                return 5
-            return 10
-
-        # 3. Area-based overrides
-        for min_area, max_area, size in TILE_SIZE_OVERRIDES:
-            if min_area <= area < max_area:
-                return size
-
-        # 4. Safe default
-        return 25
-
-    def generate_tiles_for_geom(region_name, geom, tile_km_local):
-        region_tiles = []
-        unique_tiles_set = set()
-
-        tile_size_m = tile_km_local * 1000
-        geom_m = transform(project, geom)
-        min_x, min_y, max_x, max_y = geom_m.bounds
-
-        # Compute area
-        meta_area = region_area_map.get(region_name, 0) or 0
-        geom_area = geom_m.area / 1e6  # in km² (since geom_m is in meters)
-        area = meta_area if meta_area > 0 else geom_area
-
-        print(f"   • {region_name.title()}: Area={area:.1f} km², Tile Size={tile_km_local}km")
-
-        # ---------------- Case 1 + Case 2: Single tile coverage ----------------
-        bbox_width_km = (max_x - min_x) / 1000
-        bbox_height_km = (max_y - min_y) / 1000
-        bbox_diag_km = max(bbox_width_km, bbox_height_km)
-
-        if area <= (tile_km_local ** 2) * 1.5 or bbox_diag_km <= tile_km_local * 3:
-            # force one tile (buffer slightly if small)
-            buffer = tile_size_m * (0.1 if area < 200 else 0.02)
-            min_x, min_y, max_x, max_y = (
-                min_x - buffer, min_y - buffer, max_x + buffer, max_y + buffer
-            )
-            tile_box_wgs84 = transform(reverse_project, box(min_x, min_y, max_x, max_y))
-            lon_min, lat_min, lon_max, lat_max = tile_box_wgs84.bounds
+    # 4. Safe default
+    return 25
 
-            region_tiles.append({
-                "region": region_name,
-                "state": state_name,
-                "source": geojson_source,
-                "tile_name": f"{region_name.replace(' ', '_')}_single",
-                "low": {"latitude": round(lat_min, 6), "longitude": round(lon_min, 6)},
-                "high": {"latitude": round(lat_max, 6), "longitude": round(lon_max, 6)}
-            })
-            print(f"✅ Single-tile coverage for '{region_name}' (bbox ~{bbox_diag_km:.1f} km)")
-            return region_tiles
-
-        # ---------------- Case 3: Grid tiling ----------------
-        min_overlap = 0.2 if area < 500 else 0.3
-        row, x = 0, min_x
-        while x < max_x:
-            col, y = 0, min_y
-            while y < max_y:
-                tile_box = box(x, y, x + tile_size_m, y + tile_size_m)
-                intersection = geom_m.intersection(tile_box)
-                overlap_ratio = intersection.area / tile_box.area if not intersection.is_empty else 0
-
-                if overlap_ratio >= min_overlap:
-                    tile_box_wgs84 = transform(reverse_project, tile_box)
-                    lon_min, lat_min, lon_max, lat_max = tile_box_wgs84.bounds
-                    tile_key = (round(lat_min, 6), round(lon_min, 6),
-                                round(lat_max, 6), round(lon_max, 6))
-                    if tile_key not in unique_tiles_set:
-                        unique_tiles_set.add(tile_key)
-                        safe_name = re.sub(r"[^a-zA-Z0-9_]", "_", region_name)
-                        region_tiles.append({
-                            "region": region_name,
-                            "state": state_name,
-                            "source": geojson_source,
-                            "tile_name": f"{safe_name}_r{row}_c{col}",
-                            "low": {"latitude": round(lat_min, 6), "longitude": round(lon_min, 6)},
-                            "high": {"latitude": round(lat_max, 6), "longitude": round(lon_max, 6)}
-                        })
-                col += 1
-                y += tile_size_m
-            row += 1
-            x += tile_size_m
-
-        # ---------------- Case 4: Fallback for elongated regions ----------------
-        if not region_tiles:
-            tile_box_wgs84 = transform(reverse_project, box(min_x, min_y, max_x, max_y))
-            lon_min, lat_min, lon_max, lat_max = tile_box_wgs84.bounds
-            width, height = lon_max - lon_min, lat_max - lat_min
-
-            splits = 2 if max(width, height) / min(width, height) > 3 else 1
-            for i in range(splits):
-                if height > width:
-                    split_box = box(min_x, min_y + i * (max_y - min_y) / splits,
-                                    max_x, min_y + (i + 1) * (max_y - min_y) / splits)
-                else:
-                    split_box = box(min_x + i * (max_x - min_x) / splits, min_y,
-                                    min_x + (i + 1) * (max_x - min_x) / splits, max_y)
-
-                split_wgs84 = transform(reverse_project, split_box)
-                lon_min, lat_min, lon_max, lat_max = split_wgs84.bounds
+
+def generate_tiles_for_geom(region_name, geom_m, tile_km_local, meta_area=0, state_name=None, geojson_source=None):
+    """
+    Tiles one region. `geom_m` is the region geometry already projected to EPSG:3857.
+    """
+    _, reverse_project = get_transformers()
+    region_tiles = []
+    unique_tiles_set = set()
+
+    tile_size_m = tile_km_local * 1000
+    min_x, min_y, max_x, max_y = geom_m.bounds
+
+    # Compute area
+    geom_area = geom_m.area / 1e6  # in km² (since geom_m is in meters)
+    area = meta_area if meta_area > 0 else geom_area
+
+    print(f"   • {region_name.title()}: Area={area:.1f} km², Tile Size={tile_km_local}km")
+
+    # ---------------- Case 1 + Case 2: Single tile coverage ----------------
+    bbox_width_km = (max_x - min_x) / 1000
+    bbox_height_km = (max_y - min_y) / 1000
+    bbox_diag_km = max(bbox_width_km, bbox_height_km)
+
+    if area <= (tile_km_local ** 2) * 1.5 or bbox_diag_km <= tile_km_local * 3:
+        # force one tile (buffer slightly if small)
+        buffer = tile_size_m * (0.1 if area < 200 else 0.02)
+        min_x, min_y, max_x, max_y = (
+            min_x - buffer, min_y - buffer, max_x + buffer, max_y + buffer
+        )
+        tile_box_wgs84 = transform(reverse_project, box(min_x, min_y, max_x, max_y))
+        lon_min, lat_min, lon_max, lat_max = tile_box_wgs84.bounds
+
+        region_tiles.append({
+            "region": region_name,
+            "state": state_name,
+            "source": geojson_source,
+            "tile_name": f"{region_name.replace(' ', '_')}_single",
+            "low": {"latitude": round(lat_min, 6), "longitude": round(lon_min, 6)},
+            "high": {"latitude": round(lat_max, 6), "longitude": round(lon_max, 6)}
+        })
+        print(f"✅ Single-tile coverage for '{region_name}' (bbox ~{bbox_diag_km:.1f} km)")
+        return region_tiles
+
+    # ---------------- Case 3: Grid tiling ----------------
+    min_overlap = 0.2 if area < 500 else 0.3
+    xs, ys = grid_origins(min_x, max_x, tile_size_m), grid_origins(min_y, max_y, tile_size_m)
+    rows, cols = np.meshgrid(np.arange(len(xs)), np.arange(len(ys)), indexing="ij")
+    rows, cols = rows.ravel(), cols.ravel()
+    cell_x, cell_y = xs[rows], ys[cols]
+    cells = shapely.box(cell_x, cell_y, cell_x + tile_size_m, cell_y + tile_size_m)
+
+    # Overlap ratios in bulk: cells inside the region count fully, disjoint cells not at all,
+    # and only cells on the boundary pay for an exact intersection
+    shapely.prepare(geom_m)
+    overlap_ratio = np.zeros(len(cells))
+    inside = shapely.contains_properly(geom_m, cells)
+    overlap_ratio[inside] = 1.0
+    edge = ~inside & shapely.intersects(geom_m, cells)
+    if edge.any():
+        overlap_ratio[edge] = shapely.area(shapely.intersection(geom_m, cells[edge])) / shapely.area(cells[edge])
+
+    kept = np.flatnonzero(overlap_ratio >= min_overlap)
+    if len(kept):
+        # Reproject the four corners of every kept cell in one call; the tile is their bounds
+        x0, y0 = cell_x[kept], cell_y[kept]
+        x1, y1 = x0 + tile_size_m, y0 + tile_size_m
+        lons, lats = reverse_project(
+            np.stack([x0, x1, x1, x0], axis=1).ravel(),
+            np.stack([y0, y0, y1, y1], axis=1).ravel()
+        )
+        lons, lats = np.asarray(lons).reshape(-1, 4), np.asarray(lats).reshape(-1, 4)
+        bounds = np.column_stack([lons.min(axis=1), lats.min(axis=1), lons.max(axis=1), lats.max(axis=1)])
+
+        safe_name = re.sub(r"[^a-zA-Z0-9_]", "_", region_name)
+        for i, (lon_min, lat_min, lon_max, lat_max) in zip(kept, bounds.tolist()):
+            tile_key = (round(lat_min, 6), round(lon_min, 6),
+                        round(lat_max, 6), round(lon_max, 6))
+            if tile_key not in unique_tiles_set:
+                unique_tiles_set.add(tile_key)
                 region_tiles.append({
                     "region": region_name,
                     "state": state_name,
                     "source": geojson_source,
-                    "tile_name": f"{region_name.replace(' ', '_')}_fallback_{i}",
+                    "tile_name": f"{safe_name}_r{rows[i]}_c{cols[i]}",
                     "low": {"latitude": round(lat_min, 6), "longitude": round(lon_min, 6)},
                     "high": {"latitude": round(lat_max, 6), "longitude": round(lon_max, 6)}
                 })
 
-            print(f"⚠️ Fallback: '{region_name}' covered by {splits} elongated tiles.")
+    # ---------------- Case 4: Fallback for elongated regions ----------------
+    if not region_tiles:
+        tile_box_wgs84 = transform(reverse_project, box(min_x, min_y, max_x, max_y))
+        lon_min, lat_min, lon_max, lat_max = tile_box_wgs84.bounds
+        width, height = lon_max - lon_min, lat_max - lat_min
+
+        splits = 2 if max(width, height) / min(width, height) > 3 else 1
+        for i in range(splits):
+            if height > width:
+                split_box = box(min_x, min_y + i * (max_y - min_y) / splits,
+                                max_x, min_y + (i + 1) * (max_y - min_y) / splits)
+            else:
+                split_box = box(min_x + i * (max_x - min_x) / splits, min_y,
+                                min_x + (i + 1) * (max_x - min_x) / splits, max_y)
+
+            split_wgs84 = transform(reverse_project, split_box)
+            lon_min, lat_min, lon_max, lat_max = split_wgs84.bounds
+            region_tiles.append({
+                "region": region_name,
+                "state": state_name,
+                "source": geojson_source,
+                "tile_name": f"{region_name.replace(' ', '_')}_fallback_{i}",
+                "low": {"latitude": round(lat_min, 6), "longitude": round(lon_min, 6)},
+                "high": {"latitude": round(lat_max, 6), "longitude": round(lon_max, 6)}
+            })
+
+        print(f"⚠️ Fallback: '{region_name}' covered by {splits} elongated tiles.")
 
 
-        # Diagnostics (approximate)
-        expected_tiles = int(area / (tile_km_local ** 2))
-        actual_tiles = len(region_tiles)
+    # Diagnostics (approximate)
+    expected_tiles = int(area / (tile_km_local ** 2))
+    actual_tiles = len(region_tiles)
 
-        if expected_tiles > 0:
-            deviation = abs(actual_tiles - expected_tiles) / expected_tiles * 100
-            if deviation > 30:
-                print(f"⚠️ Tile count for '{region_name}' deviates by {deviation:.1f}% "
-                    f"(Expected: ~{expected_tiles}, Got: {actual_tiles})")
-            else:
-                print(f"✅ Tile count close to expected ({actual_tiles} vs {expected_tiles})")
+    if expected_tiles > 0:
+        deviation = abs(actual_tiles - expected_tiles) / expected_tiles * 100
+        if deviation > 30:
+            print(f"⚠️ Tile count for '{region_name}' deviates by {deviation:.1f}% "
+                f"(Expected: ~{expected_tiles}, Got: {actual_tiles})")
         else:
-            print(f"⚠️ Could not estimate expected tiles for '{region_name}', area={area:.2f} km²")
+            print(f"✅ Tile count close to expected ({actual_tiles} vs {expected_tiles})")
+    else:
+        print(f"⚠️ Could not estimate expected tiles for '{region_name}', area={area:.2f} km²")
 
-        return region_tiles
-    
+    return region_tiles
+
+
+def plan_regions(geojson_source: str, regions: list, tile_scale: float = 1.0) -> list:
+    """
+    Tiles a batch of (region_name, state_name) pairs from one boundary source and returns
+    (region_name, tiles, error) per region, in order. Plans seen before come from the tile-plan cache. Also the entry point for tile-planning worker processes, so it
+    loads the geometry index itself and reports failures instead of raising.
+    """
+    geo_index = get_geometry_index(geojson_source)
+    plan_cache = get_tile_plan_cache()
+    results = []
+    for region_name, state_name in regions:
+        try:
+            region_key = region_name.strip().lower()
+            if region_key not in geo_index.geoms:
+                raise ValueError(f"No geometry found for region '{region_name}'")
+            cache_key = plan_cache.make_key(geo_index, region_key, state_name, tile_scale) if plan_cache else None
+            region_tiles = plan_cache.get(cache_key) if plan_cache else None
+            if region_tiles is None:
+                tile_km_override = determine_tile_size(region_key, geo_index.metadata.get(region_key, {}), geo_index.source) * tile_scale
+                region_tiles = generate_tiles_for_geom(
+                    region_key,
+                    geo_index.projected(region_key),
+                    tile_km_override,
+                    meta_area=geo_index.areas.get(region_key, 0) or 0,
+                    state_name=state_name,
+                    geojson_source=geo_index.source
+                )
+                if plan_cache:
+                    plan_cache.put(cache_key, geo_index.source, region_key, region_tiles)
+            results.append((region_name, region_tiles, None))
+        except Exception as e:
+            results.append((region_name, [], e))
+    return results
+
+
+def iter_region_plans(geojson_source: str, regions: list, tile_scale: float = 1.0, workers: int = None):
+    """
+    Yields plan_regions() batches for (region_name, state_name) pairs, in region order. With
+    more than one worker (None uses TILE_PLAN_WORKERS, 0 uses every CPU) the regions are
+    sharded across a process pool; results still stream back in the original order.
+    """
+    if workers is None:
+        workers = TILE_PLAN_WORKERS
+    workers = workers or os.cpu_count() or 1
+
+    chunk_size = TILE_PLAN_CHUNK_SIZE
+    if workers <= 1 or len(regions) <= chunk_size:
+        for region in regions:
+            yield plan_regions(geojson_source, [region], tile_scale)
+        return
+
+    chunks = [regions[i:i + chunk_size] for i in range(0, len(regions), chunk_size)]
+    workers = min(workers, len(chunks))
+    print(f"⚙️ Planning {len(regions)} regions on {workers} worker processes")
+    # spawn, not fork: callers may be running an event loop and driver threads
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        yield from executor.map(plan_regions, repeat(geojson_source), chunks, repeat(tile_scale))
+    finally:
+        # A consumer that stops early (e.g. limit_tiles) shouldn't wait for the remaining chunks
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_tiles_for_australia(
+    geojson_source: str = "lga",
+    target_region: str = None,
+    state_name: str = None,
+    tile_scale: float = 1.0,
+    workers: int = None
+):
+    """
+    Lazy form of generate_tiles_for_australia(): yields each region's tiles as soon as that
+    region is planned, so a crawl can start on the first tiles while the rest are still being
+    generated and the full tile list never has to be held in memory.
+    """
+    if target_region:
+        yield from generate_tiles_for_australia(
+            geojson_source=geojson_source,
+            target_region=target_region,
+            state_name=state_name,
+            tile_scale=tile_scale
+        )
+        return
+
+    geo_index = get_geometry_index(geojson_source)
+    print(f"\n📍 No specific region provided. Generating tiles for all regions in: {geo_index.source.upper()}")
+    regions = [(region_name, state_name) for region_name in geo_index.geoms]
+    with tqdm(total=len(regions), desc="🧩 Generating tiles") as progress:
+        for batch in iter_region_plans(geo_index.source, regions, tile_scale, workers):
+            for region_name, region_tiles, error in batch:
+                if error is not None:
+                    print(f"❌ Error processing {region_name}: {error}")
+                    continue
+                print(f"✅ {region_name} -> {len(region_tiles)} tiles added.")
+                yield from region_tiles
+            progress.update(len(batch))
+
+
+# Tile Generation for all regions using GeoJSON files
+def generate_tiles_for_australia(
+    tile_km: float = 10.0,
+    geojson_source: str = "lga",
+    target_region: str = None,
+    state_name: str = None,
+    tile_scale: float = 1.0,
+    workers: int = None
+):
+    """
+    `workers` only applies to the all-regions mode: None uses TILE_PLAN_WORKERS, 0 uses every CPU.
+    """
+    # Parsed geometries, areas and transformers are shared process-wide
+    geo_index = get_geometry_index(geojson_source)
+    geojson_source = geo_index.source
+
+    all_tiles = []
 
     # Targeted region mode
     if target_region:
         region_key = target_region.strip().lower()
         print(f"\n📍 Generating tiles for specified region: '{target_region}'")
-        target_geom = region_geom_map.get(region_key)
+        target_geom = geo_index.geoms.get(region_key)
+        if not target_geom:
+            # Same name up to case/punctuation (e.g. "Rest of Vic" for "Rest of Vic.")
+            region_search = get_region_search_index()
+            region_type = SOURCE_REGION_TYPES.get(geojson_source)
+            resolved = region_search.resolve(target_region, region_type, state_name)
+            if resolved:
+                region_key = resolved["name"].strip().lower()
+                target_geom = geo_index.geoms.get(region_key)
         if not target_geom:
             print(f"❌ No geometry found for region: '{target_region}'")
-            suggestions = difflib.get_close_matches(region_key, region_geom_map.keys(), n=5, cutoff=0.6)
+            suggestions = region_search.suggest(target_region, region_type, limit=5)
             if suggestions:
                 print("🔎 Did you mean one of the following?")
                 for s in suggestions:
                     print(f"   • {s}")
             return []
 
-        tile_km_override = determine_tile_size(region_key, region_metadata_map.get(region_key, {}), geojson_source)
+        tile_km_override = determine_tile_size(region_key, geo_index.metadata.get(region_key, {}), geojson_source) * tile_scale
         print(f"\n📏 Generating tiles for: {target_region} ({geojson_source.upper()}) with tile size {tile_km_override}km.")
 
-        try:
-            region_tiles = generate_tiles_for_geom(region_key, target_geom, tile_km_override)
+        [(_, region_tiles, error)] = plan_regions(geojson_source, [(region_key, state_name)], tile_scale)
+        if error is not None:
+            print(f"❌ Error generating tiles for {target_region}: {error}")
+        else:
             all_tiles.extend(region_tiles)
             print(f"✅ {target_region} -> {len(region_tiles)} tiles generated.")
-        except Exception as e:
-            print(f"❌ Error generating tiles for {target_region}: {e}")
         return all_tiles
 
     # All regions mode
-    print(f"\n📍 No specific region provided. Generating tiles for all regions in: {geojson_source.upper()}")
-    for region_name, region_geom in tqdm(region_geom_map.items(), desc="🧩 Generating tiles"):
-        try:
-            tile_km_override = determine_tile_size(region_name, region_metadata_map.get(region_name, {}), geojson_source)
-            region_tiles = generate_tiles_for_geom(region_name, region_geom, tile_km_override)
-            all_tiles.extend(region_tiles)
-            print(f"✅ {region_name} -> {len(region_tiles)} tiles added.")
-        except Exception as e:
-            print(f"❌ Error processing {region_name}: {e}")
+    all_tiles = list(iter_tiles_for_australia(geojson_source, state_name=state_name, tile_scale=tile_scale, workers=workers))
 
     print(f"\n✅ Total tiles generated: {len(all_tiles)}")
     return all_tiles
@@ -287,17 +411,11 @@ def get_gccsa_polygon(region_name: str):
     Returns:
         Tuple[str, Polygon or MultiPolygon]: The region name and Shapely geometry object.
     """
-    gccsa_geojson_path = "data/geojson/gccsa.geojson"
-    with open(gccsa_geojson_path, 'r', encoding='utf-8') as f:
-        gccsa_data = json.load(f)
-
-    for feature in gccsa_data["features"]:
-        props = feature.get("properties")
-        geom = feature.get("geometry")
-        name = props.get("GCC_NAME21", "").strip().lower()
-
-        if name == region_name.strip().lower():
-            return name, shape(geom)
+    geo_index = get_geometry_index("gccsa")
+    name = region_name.strip().lower()
+    geom = geo_index.geoms.get(name)
+    if geom is not None:
+        return name, geom
 
     print(f"⚠️ GCCSA region '{region_name}' not found in GeoJSON.")
     return None, None
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from config.settings import (
+    PLACES_CACHE_ENABLED,
+    PLACES_CACHE_PATH,
+    PLACES_CACHE_TTL_DAYS,
+    PLACES_CACHE_MAX_MB
+)
+
+
+class PlacesResponseCache:
+    """
+    Persistent SQLite cache of Places API pages.
+
+    Entries are keyed by endpoint, field mask, the request payload (minus the page token)
+    and the page's position in its page-token chain, so a re-crawl of the same tile and query
+    replays the same pages for free. Entries expire after `ttl_seconds`; once the store grows
+    past `max_bytes` the oldest entries are evicted first.
+    """
+
+    def __init__(self, path: str = PLACES_CACHE_PATH, ttl_seconds: float = PLACES_CACHE_TTL_DAYS * 86400,
+                 max_bytes: int = PLACES_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                body TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint: str, field_mask: str, payload: dict, page_index: int) -> str:
+        base = {k: v for k, v in payload.items() if k != "pageToken"}
+        raw = json.dumps([endpoint, field_mask, base, page_index], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        created_at, body = row
+        if time.time() - created_at > self.ttl_seconds:
+            self.delete(key)
+            return None
+        return json.loads(body)
+
+    def put(self, key: str, endpoint: str, data: dict):
+        body = json.dumps(data, separators=(",", ":"))
+        size = len(body)
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, created_at, size, body) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, time.time(), size, body)
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= row[0]
+
+    def _evict(self):
+        # Drop expired entries first, then the oldest until we're 10% under the cap
+        cutoff = time.time() - self.ttl_seconds
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY created_at").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        print(f"🧹 Places cache evicted {len(doomed)} entries")
+
+    async def aget(self, key: str):
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, endpoint: str, data: dict):
+        await asyncio.to_thread(self.put, key, endpoint, data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "size_mb": round(self._total_bytes / (1024 * 1024), 2)}
+
+
+_shared_cache = None
+
+
+def get_places_cache():
+    """
+    Process-wide cache instance, or None when PLACES_CACHE_ENABLED is off.
+    """
+    global _shared_cache
+    if not PLACES_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        _shared_cache = PlacesResponseCache()
+    return _shared_cache
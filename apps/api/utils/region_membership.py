@@ -0,0 +1,131 @@
+import threading
+import numpy as np
+import shapely
+from shapely import STRtree
+from utils.geo_index import get_geometry_index
+
+# Boundary layers a lead is tagged with: lead fields are <layer>_code / <layer>_name
+MEMBERSHIP_LAYERS = {
+    "sa2": {"source": "regions", "code_key": "SA2_CODE21", "name_key": "SA2_NAME21"},
+    "lga": {"source": "lga", "code_key": "LGA_CODE24", "name_key": "LGA_NAME24"},
+    "gccsa": {"source": "gccsa", "code_key": "GCC_CODE21", "name_key": "GCC_NAME21"},
+}
+
+MEMBERSHIP_FIELDS = tuple(f"{layer}_{kind}" for layer in MEMBERSHIP_LAYERS for kind in ("code", "name"))
+
+
+def lead_coordinates(location):
+    """(lng, lat) from either Places location shape ({latitude, longitude} or {lat, lng}), else None."""
+    if not isinstance(location, dict):
+        return None
+    lat = location.get("latitude", location.get("lat"))
+    lng = location.get("longitude", location.get("lng"))
+    if lat is None or lng is None:
+        return None
+    return float(lng), float(lat)
+
+
+def lead_geo_point(location):
+    """GeoJSON Point for a Places location (what the leads `geo` 2dsphere index holds), else None."""
+    coords = lead_coordinates(location)
+    if coords is None:
+        return None
+    return {"type": "Point", "coordinates": list(coords)}
+
+
+class MembershipLayer:
+    """STRtree over one boundary source's prepared polygons, with their codes and names."""
+
+    def __init__(self, name: str, source: str, code_key: str, name_key: str):
+        geo_index = get_geometry_index(source)
+        region_keys = list(geo_index.geoms)
+
+        self.name = name
+        self.geoms = np.array([geo_index.geoms[key] for key in region_keys])
+        shapely.prepare(self.geoms)
+        self.tree = STRtree(self.geoms)
+
+        metadata = [geo_index.metadata[key] for key in region_keys]
+        self.codes = [props.get(code_key) for props in metadata]
+        self.names = [props.get(name_key) for props in metadata]
+
+    def lookup(self, points) -> np.ndarray:
+        """
+        Index of the polygon containing each point (-1 when none). Points on a shared
+        boundary go to the first matching polygon.
+        """
+        matches = np.full(len(points), -1, dtype=np.int64)
+        point_idx, geom_idx = self.tree.query(points, predicate="intersects")
+        if len(point_idx):
+            # Keep the first hit per point
+            first_points, first_hits = np.unique(point_idx, return_index=True)
+            matches[first_points] = geom_idx[first_hits]
+        return matches
+
+
+class RegionMembershipIndex:
+    """
+    Point-in-polygon tagging of leads with their true SA2, LGA and GCCSA codes and names.
+    Layers load on first use; a layer whose boundary file is unavailable is skipped.
+    """
+
+    def __init__(self, layers: dict = MEMBERSHIP_LAYERS):
+        self.layer_config = layers
+        self.layers = None
+        self._lock = threading.Lock()
+
+    def _load_layers(self):
+        if self.layers is None:
+            with self._lock:
+                if self.layers is None:
+                    layers = []
+                    for name, config in self.layer_config.items():
+                        try:
+                            layers.append(MembershipLayer(name, **config))
+                        except Exception as e:
+                            print(f"⚠️ Region membership layer '{name}' unavailable: {e}")
+                    self.layers = layers
+        return self.layers
+
+    def tag(self, leads: list) -> int:
+        """
+        Sets <layer>_code / <layer>_name on every lead with a location, using one bulk
+        STRtree query per layer for the whole batch. Returns the number of leads tagged.
+        """
+        layers = self._load_layers()
+        if not layers:
+            return 0
+
+        located, lngs, lats = [], [], []
+        for lead in leads:
+            coords = lead_coordinates(lead.get("location"))
+            if coords:
+                located.append(lead)
+                lngs.append(coords[0])
+                lats.append(coords[1])
+        if not located:
+            return 0
+
+        points = shapely.points(lngs, lats)
+        for layer in layers:
+            for lead, match in zip(located, layer.lookup(points)):
+                if match >= 0:
+                    lead[f"{layer.name}_code"] = layer.codes[match]
+                    lead[f"{layer.name}_name"] = layer.names[match]
+                else:
+                    lead[f"{layer.name}_code"] = None
+                    lead[f"{layer.name}_name"] = None
+        return len(located)
+
+
+_shared_index = None
+
+
+def get_region_membership_index() -> RegionMembershipIndex:
+    """
+    Process-wide membership index shared by every ingest path.
+    """
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = RegionMembershipIndex()
+    return _shared_index
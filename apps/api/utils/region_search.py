@@ -0,0 +1,179 @@
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from config.constants import GCCSA_REGIONS, GEOJSON_MAP_PATHS
+from config.settings import REGION_SEARCH_MIN_SIMILARITY
+from utils.region_membership import MEMBERSHIP_LAYERS
+
+# Searchable region types and the boundary source (geojson_type) each one crawls with
+REGION_TYPE_SOURCES = {layer: config["source"] for layer, config in MEMBERSHIP_LAYERS.items()}
+SOURCE_REGION_TYPES = {source: layer for layer, source in REGION_TYPE_SOURCES.items()}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_region_name(name: str) -> str:
+    """Lower-cased, punctuation-free form used for matching ("Rest of Vic." -> "rest of vic")."""
+    return _NON_ALNUM.sub(" ", name.lower()).strip()
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _load_state_map(path: str) -> dict:
+    if not os.path.exists(path):
+        print(f"⚠️ Region map not found, skipping: {path}")
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_region_entries() -> list:
+    """
+    Every SA2, LGA and GCCSA name with its state, from the state -> name maps and GCCSA_REGIONS.
+    """
+    layers = {
+        "sa2": _load_state_map(GEOJSON_MAP_PATHS["state_to_regions"]),
+        "lga": _load_state_map(GEOJSON_MAP_PATHS["state_to_lgas"]),
+        "gccsa": GCCSA_REGIONS,
+    }
+    return [
+        {"name": name, "type": region_type, "state": state, "source": REGION_TYPE_SOURCES[region_type]}
+        for region_type, state_map in layers.items()
+        for state, names in state_map.items()
+        for name in names
+    ]
+
+
+class RegionSearchIndex:
+    """
+    In-memory autocomplete over region names.
+
+    Prefix matches come from a sorted list of every word-start suffix of each normalized
+    name ("queanbeyan west jerrabomberra", "west jerrabomberra", "jerrabomberra"), so a
+    query matches the start of any word with one bisect. When prefixes don't fill the
+    result, trigram postings rank the remaining names by Jaccard similarity, which catches
+    typos and transposed words.
+    """
+
+    def __init__(self, entries: list, min_similarity: float = REGION_SEARCH_MIN_SIMILARITY):
+        self.entries = entries
+        self.min_similarity = min_similarity
+        self.norms = [normalize_region_name(entry["name"]) for entry in entries]
+        self.trigram_counts = []
+
+        suffixes = []
+        postings = {}
+        for i, norm in enumerate(self.norms):
+            for match in re.finditer(r"\S+", norm):
+                suffixes.append((norm[match.start():], i))
+            grams = _trigrams(norm)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        suffixes.sort()
+        self.suffix_keys = [key for key, _ in suffixes]
+        self.suffix_ids = [i for _, i in suffixes]
+        self.postings = postings
+
+        self.alphabetical = sorted(range(len(entries)), key=lambda i: self.norms[i])
+        self.exact = {}
+        for i, norm in enumerate(self.norms):
+            self.exact.setdefault(norm, []).append(i)
+
+    def _matches_filters(self, i: int, types, state) -> bool:
+        entry = self.entries[i]
+        return (not types or entry["type"] in types) and (not state or entry["state"] == state)
+
+    def _prefix_ids(self, query: str) -> dict:
+        """id -> rank (0 = the whole name starts with the query, 1 = a later word does)."""
+        ranks = {}
+        start = bisect_left(self.suffix_keys, query)
+        for pos in range(start, len(self.suffix_keys)):
+            if not self.suffix_keys[pos].startswith(query):
+                break
+            i = self.suffix_ids[pos]
+            rank = 0 if self.norms[i].startswith(query) else 1
+            ranks[i] = min(rank, ranks.get(i, rank))
+        return ranks
+
+    def _similar_ids(self, query: str) -> dict:
+        """id -> Jaccard trigram similarity, for names above min_similarity."""
+        query_grams = _trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+        scores = {}
+        for i, common in shared.items():
+            score = common / (len(query_grams) + self.trigram_counts[i] - common)
+            if score >= self.min_similarity:
+                scores[i] = score
+        return scores
+
+    def _result(self, i: int, score: float) -> dict:
+        return {**self.entries[i], "score": round(score, 3)}
+
+    def search(self, query: str = "", limit: int = 10, types=None, state: str = None) -> list:
+        """
+        Best matches for `query`, optionally limited to region types ('sa2', 'lga', 'gccsa')
+        and a state. An empty query lists the matching names alphabetically.
+        """
+        types = set(types) if types else None
+        query = normalize_region_name(query or "")
+
+        if not query:
+            ids = (i for i in self.alphabetical if self._matches_filters(i, types, state))
+            return [self._result(i, 1.0) for i in islice(ids, limit)]
+
+        prefix = {i: rank for i, rank in self._prefix_ids(query).items() if self._matches_filters(i, types, state)}
+        ranked = sorted(prefix, key=lambda i: (prefix[i], len(self.norms[i]), self.norms[i]))
+        results = [self._result(i, 1.0 if prefix[i] == 0 else 0.9) for i in ranked[:limit]]
+
+        if len(results) < limit:
+            similar = {
+                i: score for i, score in self._similar_ids(query).items()
+                if i not in prefix and self._matches_filters(i, types, state)
+            }
+            ranked = sorted(similar, key=lambda i: (-similar[i], self.norms[i]))
+            results.extend(self._result(i, similar[i]) for i in ranked[:limit - len(results)])
+        return results
+
+    def resolve(self, name: str, region_type: str = None, state: str = None):
+        """
+        The entry whose normalized name equals `name` ("queanbeyan west jerrabomberra" finds
+        "Queanbeyan West - Jerrabomberra"), preferring one in `state`. None if there is none.
+        """
+        candidates = [
+            i for i in self.exact.get(normalize_region_name(name), [])
+            if self._matches_filters(i, {region_type} if region_type else None, None)
+        ]
+        if not candidates:
+            return None
+        in_state = [i for i in candidates if self.entries[i]["state"] == state]
+        return self.entries[(in_state or candidates)[0]]
+
+    def suggest(self, name: str, region_type: str = None, limit: int = 5) -> list:
+        """Closest region names for a name that didn't match, best first."""
+        return [result["name"] for result in self.search(name, limit, types=[region_type] if region_type else None)]
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_region_search_index() -> RegionSearchIndex:
+    """
+    Process-wide region search index, built on first use.
+    """
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                _shared_index = RegionSearchIndex(load_region_entries())
+    return _shared_index
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from config.settings import RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES
+
+
+class ResponseCache:
+    """
+    In-process cache of read-endpoint responses, keyed by route and normalized query params.
+
+    Entries expire after `ttl_seconds` and the least recently used are evicted past
+    `max_entries`. Concurrent misses for the same key share one in-flight load (single
+    flight), which runs as its own task so a caller disconnecting doesn't cancel it for
+    the others. `invalidate()` drops everything, and loads already running when it is
+    called are not cached, so a response never outlives the write that made it stale.
+    """
+
+    def __init__(self, ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._inflight = {}  # key -> load task
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(route: str, params: dict) -> str:
+        # Unset params don't change the response, so they don't change the key either
+        given = {k: v for k, v in params.items() if v is not None}
+        return json.dumps([route, given], sort_keys=True, separators=(",", ":"), default=str)
+
+    async def _load(self, key: str, loader, generation: int):
+        try:
+            value = await loader()
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    async def get_or_load(self, key: str, loader):
+        """
+        Cached value for `key`, else the result of `await loader()` (shared with any
+        concurrent caller asking for the same key). Loader exceptions are not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, loader, self._generation))
+            # Retrieve the outcome even if every waiter went away, so failures aren't reported as unhandled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def invalidate(self):
+        self._generation += 1
+        self._entries.clear()
+        # Later requests must not join loads that may have read pre-write data
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "in_flight": len(self._inflight), "hits": self.hits,
+                "misses": self.misses, "coalesced": self.coalesced}
+
+
+class _DisabledResponseCache:
+    """Stand-in when RESPONSE_CACHE_ENABLED is off: every call goes to the database."""
+
+    make_key = staticmethod(ResponseCache.make_key)
+
+    async def get_or_load(self, key: str, loader):
+        return await loader()
+
+    def invalidate(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"enabled": False}
+
+
+_shared_cache = None
+
+
+def get_response_cache():
+    """
+    Process-wide response cache shared by the read routes and invalidated by the lead writer.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache() if RESPONSE_CACHE_ENABLED else _DisabledResponseCache()
+    return _shared_cache
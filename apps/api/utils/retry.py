@@ -0,0 +1,124 @@
+import random
+import time
+from config.settings import (
+    PLACES_RETRY_MAX_ATTEMPTS,
+    PLACES_RETRY_BASE_DELAY,
+    PLACES_RETRY_MAX_DELAY,
+    PLACES_RETRY_MAX_TOTAL_TIME,
+    PLACES_CIRCUIT_FAILURE_THRESHOLD,
+    PLACES_CIRCUIT_RESET_TIMEOUT
+)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PlacesRequestError(Exception):
+    """
+    Raised when a Places call keeps failing with a transient error after all retries.
+    Crawlers treat it as retryable and re-queue the tile.
+    """
+
+    def __init__(self, endpoint: str, message: str, status_code: int = None):
+        super().__init__(f"[{endpoint}] {message}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.retry_in = 0.0
+
+
+class CircuitOpenError(PlacesRequestError):
+    """Raised without touching the network while an endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(endpoint, f"Circuit open, retry in {retry_in:.1f}s")
+        self.retry_in = retry_in
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by attempt count and total time spent retrying.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = PLACES_RETRY_MAX_ATTEMPTS,
+        base_delay: float = PLACES_RETRY_BASE_DELAY,
+        max_delay: float = PLACES_RETRY_MAX_DELAY,
+        max_total_time: float = PLACES_RETRY_MAX_TOTAL_TIME
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_total_time = max_total_time
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after:
+            return min(self.max_delay, max(backoff, retry_after))
+        return backoff
+
+    def should_retry(self, attempt: int, started_at: float, delay: float) -> bool:
+        """`attempt` is the zero-based number of the attempt that just failed."""
+        if attempt + 1 >= self.max_attempts:
+            return False
+        return (time.monotonic() - started_at) + delay <= self.max_total_time
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker: opens after consecutive transient failures, lets one probe through
+    after `reset_timeout`, and closes again on the first success.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = PLACES_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = PLACES_CIRCUIT_RESET_TIMEOUT
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """Raises CircuitOpenError while open; returns True if this request is the half-open probe."""
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(self.name, self.reset_timeout - (time.monotonic() - self.opened_at))
+        if state == "half-open":
+            if self.probing:
+                # A probe is already in flight; everyone else waits for its verdict
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self.probing = True
+            return True
+        return False
+
+    def release_probe(self):
+        """Ends a probe that gave no verdict (e.g. it was cancelled), so the next request probes again."""
+        self.probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self.probing:
+                print(f"🔌 Circuit for '{self.name}' opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+    def summary(self) -> dict:
+        return {"endpoint": self.name, "state": self.state, "consecutive_failures": self.failures}
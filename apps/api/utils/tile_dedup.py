@@ -0,0 +1,174 @@
+import math
+from collections import defaultdict
+import numpy as np
+import shapely
+from config.settings import TILE_DEDUP_COVERAGE, TILE_DEDUP_BUCKET_DEG, TILE_DEDUP_HOLD_MARGIN_DEG
+
+
+def tile_box(tile: dict):
+    low, high = tile["low"], tile["high"]
+    return shapely.box(low["longitude"], low["latitude"], high["longitude"], high["latitude"])
+
+
+class TileDeduplicator:
+    """
+    Plans tiles from many regions onto one global spatial hash and drops tiles whose area is
+    already covered (>= `coverage` of it) by kept tiles. Kept tiles carry a "regions" list of
+    every {region, state} they stand in for (each dropped tile is added to every kept tile
+    overlapping it), so leads can still be attributed to the regions whose tiles were dropped.
+
+    It works on a stream of regions: a kept tile is held back until every region still to be
+    planned whose extent (padded by `hold_margin_deg`) reaches it has been planned, so its
+    "regions" list is final by the time `deduplicate()` yields it for crawling. Released tiles
+    never absorb later tiles; a tile only they would have covered is kept instead.
+    """
+
+    def __init__(
+        self,
+        coverage: float = TILE_DEDUP_COVERAGE,
+        bucket_deg: float = TILE_DEDUP_BUCKET_DEG,
+        hold_margin_deg: float = TILE_DEDUP_HOLD_MARGIN_DEG
+    ):
+        self.coverage = coverage
+        self.bucket_deg = bucket_deg
+        self.hold_margin_deg = hold_margin_deg
+        # Kept tiles not yet released, by tile id; only these can absorb dropped tiles
+        self.held = {}
+        self.boxes = {}
+        self.buckets = defaultdict(set)
+        # Regions still to be planned, by region id (position in planning order)
+        self.region_boxes = {}
+        self.region_buckets = defaultdict(set)
+        self.waiting_on = {}  # tile id -> unplanned region ids that could still merge into it
+        self.holding = defaultdict(set)  # region id -> tile ids waiting on it
+        self.ready = []
+        self.next_id = 0
+        self.seen = 0
+        self.kept = 0
+        self.dropped = 0
+
+    def _bucket_keys(self, geom):
+        lon_min, lat_min, lon_max, lat_max = geom.bounds
+        for i in range(math.floor(lon_min / self.bucket_deg), math.floor(lon_max / self.bucket_deg) + 1):
+            for j in range(math.floor(lat_min / self.bucket_deg), math.floor(lat_max / self.bucket_deg) + 1):
+                yield i, j
+
+    def _covering_tiles(self, geom) -> list:
+        """Ids of the held tiles overlapping `geom` if together they cover enough of it, else []."""
+        candidates = sorted({i for key in self._bucket_keys(geom) for i in self.buckets.get(key, ())})
+        if not candidates:
+            return []
+
+        candidate_boxes = np.array([self.boxes[i] for i in candidates])
+        overlaps = shapely.area(shapely.intersection(candidate_boxes, geom))
+        if not overlaps.any():
+            return []
+
+        if geom.area > 0:
+            covered = shapely.intersection(shapely.union_all(candidate_boxes[overlaps > 0]), geom).area
+            if covered / geom.area < self.coverage:
+                return []
+        return [i for i, overlap in zip(candidates, overlaps) if overlap > 0]
+
+    def expect_region(self, region_id: int, bounds: tuple):
+        """
+        Registers a region that will be planned later, by its (lon_min, lat_min, lon_max, lat_max)
+        extent. Kept tiles within reach of it are held until finish_region(region_id).
+        """
+        margin = self.hold_margin_deg
+        lon_min, lat_min, lon_max, lat_max = bounds
+        geom = shapely.box(lon_min - margin, lat_min - margin, lon_max + margin, lat_max + margin)
+        self.region_boxes[region_id] = geom
+        for key in self._bucket_keys(geom):
+            self.region_buckets[key].add(region_id)
+
+    def finish_region(self, region_id: int):
+        """Marks a region as fully planned and releases the tiles that were only waiting on it."""
+        geom = self.region_boxes.pop(region_id, None)
+        if geom is not None:
+            for key in self._bucket_keys(geom):
+                self.region_buckets[key].discard(region_id)
+        for tile_id in self.holding.pop(region_id, ()):
+            waiting = self.waiting_on[tile_id]
+            waiting.discard(region_id)
+            if not waiting:
+                del self.waiting_on[tile_id]
+                self.ready.append(tile_id)
+
+    def add(self, tile: dict, region_id: int = None) -> bool:
+        """
+        Returns True if the tile should be crawled, False if it was merged into the held tiles covering it.
+        Kept tiles are crawlable once released (see `release()`).
+        """
+        self.seen += 1
+        geom = tile_box(tile)
+        attribution = {"region": tile.get("region"), "state": tile.get("state")}
+
+        covering = self._covering_tiles(geom)
+        if covering:
+            # Every tile sharing part of the dropped one searches that part for its region too
+            # (the polygon filter keeps only places inside the regions a tile stands for)
+            for tile_id in covering:
+                regions = self.held[tile_id]["regions"]
+                if attribution not in regions:
+                    regions.append(attribution)
+            self.dropped += 1
+            return False
+
+        tile_id = self.next_id
+        self.next_id += 1
+        tile["regions"] = [attribution]
+        self.held[tile_id] = tile
+        self.boxes[tile_id] = geom
+        for key in self._bucket_keys(geom):
+            self.buckets[key].add(tile_id)
+        self.kept += 1
+
+        # Its own region may still plan tiles that merge into it, so that one always counts
+        waiting = {
+            other for key in self._bucket_keys(geom) for other in self.region_buckets.get(key, ())
+            if self.region_boxes[other].intersects(geom)
+        }
+        if region_id is not None:
+            waiting.add(region_id)
+        if waiting:
+            self.waiting_on[tile_id] = waiting
+            for other in waiting:
+                self.holding[other].add(tile_id)
+        else:
+            self.ready.append(tile_id)
+        return True
+
+    def release(self) -> list:
+        """Kept tiles whose "regions" list is final, in the order they were kept."""
+        released = []
+        for tile_id in sorted(self.ready):
+            for key in self._bucket_keys(self.boxes.pop(tile_id)):
+                self.buckets[key].discard(tile_id)
+            released.append(self.held.pop(tile_id))
+        self.ready = []
+        return released
+
+    def deduplicate(self, region_plans, region_bounds=None):
+        """
+        Yields the tiles worth crawling, lazily. `region_plans` is one tile iterable per region,
+        in planning order; `region_bounds` lists each region's extent in the same order (None
+        where unknown). Without extents, tiles are only held until their own region is planned.
+        """
+        for region_id, bounds in enumerate(region_bounds or ()):
+            if bounds is not None:
+                self.expect_region(region_id, bounds)
+
+        for region_id, tiles in enumerate(region_plans):
+            for tile in tiles:
+                self.add(tile, region_id)
+            self.finish_region(region_id)
+            yield from self.release()
+
+        # Every region is planned, so whatever is still held is final
+        for region_id in list(self.holding):
+            self.finish_region(region_id)
+        yield from self.release()
+
+    def stats(self) -> dict:
+        return {"tiles_planned": self.seen, "tiles_kept": self.kept, "tiles_deduplicated": self.dropped}
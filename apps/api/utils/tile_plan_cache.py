@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from config.constants import GCCSA_REGIONS, TILE_SIZE_OVERRIDES, LOW_DENSITY_REGION_KEYWORDS
+from config.settings import TILE_PLAN_CACHE_ENABLED, TILE_PLAN_CACHE_PATH
+
+# Bump whenever tiling logic changes output, so stale plans are never served
+TILE_PLAN_VERSION = 1
+
+# Everything determine_tile_size() reads besides the boundary file itself
+SIZING_RULES_HASH = hashlib.sha256(
+    json.dumps(
+        [TILE_SIZE_OVERRIDES, sorted(LOW_DENSITY_REGION_KEYWORDS), GCCSA_REGIONS],
+        sort_keys=True
+    ).encode("utf-8")
+).hexdigest()
+
+
+class TilePlanCache:
+    """
+    Tile plans per region, kept in memory and in SQLite.
+
+    Keys cover the boundary source, region, state, tile scale, the sizing rules and the
+    boundary content hash, so editing TILE_SIZE_OVERRIDES / LOW_DENSITY_REGION_KEYWORDS or
+    replacing a GeoJSON file simply stops matching old entries.
+    """
+
+    def __init__(self, path: str = TILE_PLAN_CACHE_PATH):
+        self.path = path
+        self._memory = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tile_plans (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                region TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                tiles TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(geo_index, region_name: str, state_name: str, tile_scale: float) -> str:
+        raw = json.dumps(
+            [TILE_PLAN_VERSION, SIZING_RULES_HASH, geo_index.source, geo_index.fingerprint,
+             region_name, state_name, float(tile_scale)],
+            separators=(",", ":")
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        # Plans are stored as JSON text and decoded per hit, so callers can't mutate the cached copy
+        body = self._memory.get(key)
+        if body is None:
+            with self._lock:
+                row = self._conn.execute("SELECT tiles FROM tile_plans WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            body = self._memory[key] = row[0]
+        return json.loads(body)
+
+    def put(self, key: str, source: str, region_name: str, tiles: list):
+        body = json.dumps(tiles, separators=(",", ":"))
+        self._memory[key] = body
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tile_plans (key, source, region, created_at, tiles) VALUES (?, ?, ?, ?, ?)",
+                (key, source, region_name, time.time(), body)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        self._memory.clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM tile_plans")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM tile_plans").fetchone()[0]
+        return {"entries": entries, "in_memory": len(self._memory)}
+
+
+_shared_cache = None
+
+
+def get_tile_plan_cache():
+    """
+    Process-wide tile-plan cache, or None when TILE_PLAN_CACHE_ENABLED is off.
+    """
+    global _shared_cache
+    if not TILE_PLAN_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        _shared_cache = TilePlanCache()
+    return _shared_cache
@@ -1,20 +1,22 @@
 import streamlit as st
 import os
 import sys
-import json
-from api.config.constants import ALL_BUSINESS_TYPES, GCCSA_REGIONS, AU_REGIONS, GEOJSON_MAP_PATHS
-from utils.api import crawl_text_search_full, crawl_custom_text_search, crawl_text_search_trial, get_region_coverage
+from api.config.constants import ALL_BUSINESS_TYPES, AU_REGIONS
+from utils.api import crawl_text_search_full, crawl_custom_text_search, crawl_text_search_trial, get_region_coverage, search_regions
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
-# Load LGA and Region maps (should be placed in your frontend data directory or read via API)
-with open(GEOJSON_MAP_PATHS["state_to_lgas"]) as f:
-    STATE_TO_LGAS = json.load(f)
+# Geography level -> region type served by the /regions/search autocomplete, and the geojson source crawled
+GEO_REGION_TYPES = {"Regions": "sa2", "LGA": "lga", "GCCSA": "gccsa"}
+GEO_SOURCES = {"Regions": "regions", "LGA": "lga", "GCCSA": "gccsa"}
 
-with open(GEOJSON_MAP_PATHS["state_to_regions"]) as f:
-    STATE_TO_REGIONS = json.load(f)
+
+# Region names come from the API's search index; reruns with the same inputs reuse the last answer
+@st.cache_data(ttl=600, show_spinner=False)
+def find_regions(query, region_type, state):
+    return search_regions(query=query, region_type=region_type, state=state, limit=1000 if not query else 50)
 
 
 st.set_page_config(page_title="🔍 Text Search Crawler", layout="wide")
@@ -51,14 +53,16 @@ geo_type = st.selectbox(
     help="Choose which geo-level to select region from."
 )
 
+# Narrow the area list as you type (matches any word start, tolerates typos)
+region_query = st.text_input("Search Area", placeholder="Start typing a region name (optional)")
+
 # Get available region options based on geo type and state
 region_options = []
-if geo_type == "Regions":
-    region_options = STATE_TO_REGIONS.get(selected_state, [])
-elif geo_type == "LGA":
-    region_options = STATE_TO_LGAS.get(selected_state, [])
-elif geo_type == "GCCSA":
-    region_options = GCCSA_REGIONS.get(selected_state, [])
+region_search = find_regions(region_query.strip(), GEO_REGION_TYPES[geo_type], selected_state)
+if "error" in region_search:
+    st.error(region_search["error"])
+else:
+    region_options = [match["name"] for match in region_search.get("results", [])]
 
 # Region Selection
 selected_region_option = st.selectbox(
@@ -87,7 +91,8 @@ if st.button("Start Text Search Crawl"):
                 query=selected_business_type,
                 state=selected_state,
                 region=region_to_use,
-                dry_run=run_custom_dry
+                dry_run=run_custom_dry,
+                geojson_type=GEO_SOURCES[geo_type]
             )
 
         if "error" in result:
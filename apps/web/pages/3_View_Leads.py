@@ -29,32 +29,53 @@ else:
 
 selected_type = col3.selectbox("Filter by Business Type", type_options)
 
+col4, col5 = st.columns(2)
+page_size = col4.selectbox("Leads per page", [50, 100, 250, 500, 1000], index=1)
+load_all_fields = col5.checkbox("Load all fields", value=False, help="Fetch every stored field instead of the table columns")
+
 # Prepare query params
 query_state = None if selected_state == "All" else selected_state
 query_type = None if selected_type == "All" else selected_type
 
+columns_to_display = [
+    "name", "address", "phone", "website",
+    "state", "region", "types", "retrieved_at"
+]
+
+# === Pagination State ===
+# Cursors of every page visited so far; filters or page size changing starts again from page 1
+page_key = (query_state, query_type, page_size, load_all_fields)
+if st.session_state.get("leads_page_key") != page_key:
+    st.session_state["leads_page_key"] = page_key
+    st.session_state["leads_cursors"] = [None]
+cursors = st.session_state["leads_cursors"]
+
 # === Fetch Leads ===
 with st.spinner("🔄 Fetching filtered leads from database..."):
-    leads = get_leads(state=query_state, type_=query_type)
+    page = get_leads(
+        state=query_state,
+        type_=query_type,
+        limit=page_size,
+        cursor=cursors[-1],
+        fields=None if load_all_fields else columns_to_display
+    )
 
 # === Results Display ===
-if isinstance(leads, dict) and "error" in leads:
-    st.error(leads["error"])
-elif not leads:
+if "error" in page:
+    st.error(page["error"])
+elif not page.get("items"):
     st.info("No leads found for the selected filters.")
 else:
-    df = pd.DataFrame(leads)
+    df = pd.DataFrame(page["items"])
 
     if df.empty:
         st.info("No matching results.")
     else:
-        st.markdown(f"### 🧾 Showing `{len(df)}` result(s)")
+        page_number = len(cursors)
+        first = (page_number - 1) * page_size + 1
+        st.markdown(f"### 🧾 Page `{page_number}`: showing results `{first}`–`{first + len(df) - 1}`")
 
         # Select and format columns
-        columns_to_display = [
-            "name", "address", "phone", "website",
-            "state", "region", "types", "retrieved_at"
-        ]
         displayable = [col for col in columns_to_display if col in df.columns]
 
         # Format timestamps
@@ -66,3 +87,11 @@ else:
 
         with st.expander("🔍 View Full Table"):
             st.dataframe(df, use_container_width=True)
+
+        prev_col, next_col = st.columns(2)
+        if prev_col.button("⬅️ Previous page", disabled=page_number == 1):
+            cursors.pop()
+            st.rerun()
+        if next_col.button("Next page ➡️", disabled=not page.get("next_cursor")):
+            cursors.append(page["next_cursor"])
+            st.rerun()
@@ -20,10 +20,19 @@ def crawl_businesses(state, region, types):
         return {"error": f"Crawl failed: {str(e)}"}
 
 
-def get_leads(state=None, type_=None, category=None, business_type=None):
-    """Fetch saved businesses with optional filters."""
+def get_leads(state=None, type_=None, category=None, business_type=None, limit=None, cursor=None, fields=None):
+    """
+    Fetch one page of saved businesses with optional filters.
+    Returns {"items", "count", "next_cursor"}; pass `next_cursor` back as `cursor` for the next page.
+    """
     try:
         params = {}
+        if limit:
+            params["limit"] = limit
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
         if state:
             params["state"] = state
         if type_:
@@ -79,7 +88,7 @@ def crawl_entire_state_or_all(dry_run=True):
         return {"error": f"Automated crawl failed: {str(e)}"}
     
 
-def crawl_custom_text_search(query: str, state: str, region: str, dry_run=False):
+def crawl_custom_text_search(query: str, state: str, region: str, dry_run=False, geojson_type="regions"):
     """Call custom scoped text search API."""
     try:
         response = requests.get(
@@ -88,6 +97,7 @@ def crawl_custom_text_search(query: str, state: str, region: str, dry_run=False)
                 "query": query,
                 "state": state,
                 "region": region,
+                "geojson_type": geojson_type,
                 "dry_run": str(dry_run).lower()
             }
         )
@@ -134,3 +144,19 @@ def get_region_coverage(state=None, region=None):
         return response.json()
     except Exception as e:
         return {"error": str(e)}
+
+
+def search_regions(query="", region_type=None, state=None, limit=10):
+    """Region autocomplete: SA2/LGA/GCCSA names matching `query`, each with the geojson source to crawl it with."""
+    try:
+        params = {"q": query, "limit": limit}
+        if region_type:
+            params["type"] = region_type
+        if state:
+            params["state"] = state
+
+        response = requests.get(f"{BASE_URL}/api/regions/search", params=params)
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        return {"error": f"Region search failed: {str(e)}"}